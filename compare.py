@@ -1,19 +1,59 @@
 import docx
-from difflib import SequenceMatcher
 import sys
 import os
 import string
 import re
 import unicodedata
+import functools
+from collections import Counter
+import zipfile
+import contextlib
+import hashlib
+import pickle
+import tempfile
+from lxml import etree
 
 # Define the base path for document comparison
 BASE_PATH = "/Users/armaanparikh/Documents/EBRL/RC"
 
-def normalize_word(word):
-    """Remove all Unicode punctuation and lowercase the word."""
-    word = unicodedata.normalize('NFKC', word)
-    word = ''.join(ch for ch in word if not unicodedata.category(ch).startswith('P'))
-    return word.lower()
+# On-disk cache of extracted .docx text, one file per document, reused while its mtime and size are unchanged
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ebrl")
+DOCX_CACHE_DIR = os.path.join(CACHE_DIR, "docx")
+
+# WordprocessingML namespace and the run content python-docx turns into paragraph text
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+W_T = f'{{{W_NS}}}t'
+RUN_CONTENT_XPATH = etree.XPath(
+    'w:r/* | w:hyperlink/w:r/*',
+    namespaces={'w': W_NS},
+)
+RUN_SPECIAL_TEXT = {
+    f'{{{W_NS}}}tab': '\t',
+    f'{{{W_NS}}}ptab': '\t',
+    f'{{{W_NS}}}br': '\n',
+    f'{{{W_NS}}}cr': '\n',
+    f'{{{W_NS}}}noBreakHyphen': '-',
+}
+
+# Also strip accents (NFKD, then drop anything non-ASCII) so "café" and "cafe" compare equal.
+# Off by default because it also discards non-Latin words entirely.
+FOLD_ACCENTS = False
+
+@functools.lru_cache(maxsize=None)
+def punctuation_table():
+    """Build (once) a str.translate table that deletes every Unicode punctuation character."""
+    return dict.fromkeys(cp for cp in range(sys.maxunicode + 1) if unicodedata.category(chr(cp)).startswith('P'))
+
+def normalize_text(text):
+    """Apply NFKC, remove all Unicode punctuation and casefold a whole document in one pass."""
+    text = unicodedata.normalize('NFKC', text).casefold()
+    if FOLD_ACCENTS:
+        text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return text.translate(punctuation_table())
+
+def split_words(text):
+    """Normalize a text and split it into words, interning them so repeated words share one string object."""
+    return [sys.intern(word) for word in normalize_text(text).split()]
 
 def get_participant_directory():
     """Get participant name and return the full directory path."""
@@ -30,51 +70,171 @@ def get_participant_directory():
             print(f"Directory not found for participant: {participant}")
             print("Please check the participant name and try again.")
 
+def read_docx_xml(file_path):
+    """Extract paragraph text straight from word/document.xml, without building the python-docx object model."""
+    with zipfile.ZipFile(file_path) as archive, archive.open('word/document.xml') as document_xml:
+        body = etree.parse(document_xml).getroot().find(f'{{{W_NS}}}body')
+    return '\n'.join(
+        ''.join((el.text or '') if el.tag == W_T else RUN_SPECIAL_TEXT.get(el.tag, '') for el in RUN_CONTENT_XPATH(para))
+        for para in body.iterfind(f'{{{W_NS}}}p')
+    )
+
 def read_docx(file_path):
-    """Read a .docx file and return its text content."""
+    """Read a .docx file and return its text content, one paragraph per line."""
     try:
-        doc = docx.Document(file_path)
-        full_text = []
-        for para in doc.paragraphs:
-            full_text.append(para.text)
-        return ' '.join(full_text)
+        try:
+            return read_docx_xml(file_path)
+        except (KeyError, AttributeError, zipfile.BadZipFile, etree.XMLSyntaxError):
+            # Fall back to python-docx for files the direct XML reader can't handle
+            doc = docx.Document(file_path)
+            return '\n'.join(para.text for para in doc.paragraphs)
     except Exception as e:
         print(f"Error reading file {file_path}: {str(e)}")
         sys.exit(1)
 
-def compare_texts(text1, text2):
-    """Compare two texts and return similarity metrics."""
-    # Split texts into words and normalize them (for positional comparison)
-    words1 = [normalize_word(word) for word in text1.split()]
-    words2 = [normalize_word(word) for word in text2.split()]
+def cache_entry_path(cache_dir, abs_path):
+    """Return the file in cache_dir that holds the cache entry for a document, named by a hash of its path."""
+    return os.path.join(cache_dir, hashlib.sha256(abs_path.encode('utf-8', 'surrogatepass')).hexdigest() + '.pickle')
+
+def load_cache_entry(cache_dir, abs_path, key):
+    """Return the value cached for a document if it was stored under the same key, else None."""
+    # The cache is only an optimization; any problem with it counts as a miss
+    try:
+        with open(cache_entry_path(cache_dir, abs_path), 'rb') as f:
+            cached_path, cached_key, value = pickle.load(f)
+    except Exception:
+        return None
+    return value if (cached_path, cached_key) == (abs_path, key) else None
+
+def store_cache_entry(cache_dir, abs_path, key, value):
+    """Cache a value for a document under key, replacing any earlier entry atomically."""
+    # One small file per document, written next to its final name and renamed into place, so an
+    # interrupted write can never leave a damaged entry (or damage any other document's)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump((abs_path, key, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_entry_path(cache_dir, abs_path))
+    except Exception:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+
+@functools.lru_cache(maxsize=64)
+def load_docx_text(abs_path, mtime_ns, size):
+    """Return a .docx file's text, using the on-disk cache when the file is unchanged since it was stored."""
+    text = load_cache_entry(DOCX_CACHE_DIR, abs_path, (mtime_ns, size))
+    if text is None:
+        text = read_docx(abs_path)
+        store_cache_entry(DOCX_CACHE_DIR, abs_path, (mtime_ns, size), text)
+    return text
+
+def read_docx_cached(file_path):
+    """Read a .docx file through the in-process and on-disk caches, keyed by path, mtime and size."""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return read_docx(file_path)  # Reports the error
+    return load_docx_text(os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+
+def lcs_length(words1, words2):
+    """Length of the longest common subsequence of two word lists, computed bit-parallel (Hyyro)."""
+    # A shared prefix and suffix are always part of the LCS, so only the middle needs the DP
+    prefix = 0
+    limit = min(len(words1), len(words2))
+    while prefix < limit and words1[prefix] == words2[prefix]:
+        prefix += 1
+    suffix = 0
+    limit -= prefix
+    while suffix < limit and words1[-1 - suffix] == words2[-1 - suffix]:
+        suffix += 1
+    if prefix or suffix:
+        words1 = words1[prefix:len(words1) - suffix]
+        words2 = words2[prefix:len(words2) - suffix]
+    if not words1 or not words2:
+        return prefix + suffix
     
-    # Number of matches: number of words in the LCS (used as numerator for word order similarity)
-    matcher = SequenceMatcher(None, words1, words2)
-    num_matches = sum(triple.size for triple in matcher.get_matching_blocks()[:-1])  # Exclude dummy block
-    total_words = max(len(words1), len(words2))
+    # Bit i of a word's mask is set wherever that word occurs in words1
+    masks = {}
+    for i, word in enumerate(words1):
+        masks[word] = masks.get(word, 0) | (1 << i)
     
+    # One DP row packed into an int: each cleared bit is one LCS match so far, and each
+    # word of words2 advances the whole row with a few big-int operations
+    full = (1 << len(words1)) - 1
+    row = full
+    for word in words2:
+        matches = row & masks.get(word, 0)
+        if matches:
+            row = ((row + matches) | (row - matches)) & full
+    return prefix + suffix + len(words1) - bin(row).count('1')
+
+def summarize_comparison(words1, words2, num_matches, word_order_similarity):
+    """Build the similarity metrics dict for two normalized word lists."""
     # Number of different words: all non-matching words, including extras at the end, divided by 2
     different_words = ((len(words1) + len(words2)) - 2 * num_matches) / 2
     
-    # Sequence similarity using normalized text
-    normalized_text1 = ' '.join(words1)
-    normalized_text2 = ' '.join(words2)
-    sequence_similarity = SequenceMatcher(None, normalized_text1, normalized_text2).ratio()
-    
-    # Word order similarity using normalized words
-    word_order_similarity = matcher.ratio()
-    
     return {
-        'total_words': total_words,
+        'total_words': max(len(words1), len(words2)),
         'num_matches': num_matches,
         'different_words': different_words,
-        'sequence_similarity': sequence_similarity,
         'word_order_similarity': word_order_similarity
     }
 
+def may_reach_threshold(words1, words2, threshold):
+    """Check the cheap upper bounds on word order similarity before running the full comparison."""
+    total = len(words1) + len(words2)
+    if not total:
+        return True
+    # Same bound as SequenceMatcher.real_quick_ratio(): only the lengths are needed
+    if 2 * min(len(words1), len(words2)) / total < threshold:
+        return False
+    # Same bound as SequenceMatcher.quick_ratio(): shared words, ignoring their order
+    common = sum((Counter(words1) & Counter(words2)).values())
+    return 2 * common / total >= threshold
+
+def compare_texts(text1, text2, threshold=None):
+    """Compare two texts and return similarity metrics, or None if they cannot reach threshold."""
+    # Normalize each text as a whole, then split into words (for positional comparison)
+    words1 = split_words(text1)
+    words2 = split_words(text2)
+    if threshold is not None and not may_reach_threshold(words1, words2, threshold):
+        return None
+    
+    return compare_words(words1, words2)
+
+def compare_words(words1, words2):
+    """Compare two normalized word lists and return similarity metrics."""
+    # Number of matches: number of words in the LCS (used as numerator for word order similarity)
+    num_matches = lcs_length(words1, words2)
+    total = len(words1) + len(words2)
+    word_order_similarity = 2 * num_matches / total if total else 1.0
+    
+    return summarize_comparison(words1, words2, num_matches, word_order_similarity)
+
+def compare_many(ref_words, others, threshold=None):
+    """Compare a reference word list against several other word lists and return one metrics dict per list.
+    
+    Word lists that cannot reach threshold get None instead of a metrics dict.
+    """
+    ref_words = list(ref_words)
+    results = []
+    for words in others:
+        words = list(words)
+        if threshold is not None and not may_reach_threshold(ref_words, words, threshold):
+            results.append(None)
+        else:
+            results.append(compare_words(ref_words, words))
+    return results
+
 def list_available_files(directory):
     """List all .docx and .txt files in the specified directory and return the list, excluding files that start with ~."""
-    files = [file for file in os.listdir(directory) if (file.endswith('.docx') or file.endswith('.txt')) and not file.startswith('~')]
+    with os.scandir(directory) as entries:
+        files = [entry.name for entry in entries
+                 if entry.name.endswith(('.docx', '.txt')) and not entry.name.startswith('~') and entry.is_file()]
     print("\nAvailable .docx/.txt files in the directory:")
     for idx, file in enumerate(files, 1):
         print(f"  {idx}. {file}")
@@ -104,13 +264,21 @@ def get_valid_file_path(directory, prompt, files=None):
                 print(f"File not found: {filename}")
                 print("Please choose from the available files listed above.")
 
+def get_valid_file_paths(directory, prompt, files):
+    """Get one or more file paths from user input, selected by numbers separated by spaces."""
+    while True:
+        selections = input(prompt).split()
+        if selections and all(sel.isdigit() and 1 <= int(sel) <= len(files) for sel in selections):
+            return [os.path.join(directory, files[int(sel) - 1]) for sel in selections]
+        print("Invalid selection. Please enter file numbers from the list above, separated by spaces.")
+
 def read_file(file_path):
     """Read a .docx or .txt file and return its text content."""
     if file_path.endswith('.docx'):
-        return read_docx(file_path)
+        return read_docx_cached(file_path)
     elif file_path.endswith('.txt'):
         try:
-            with open(file_path, 'r') as f:
+            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
                 return f.read()
         except Exception as e:
             print(f"Error reading file {file_path}: {str(e)}")
@@ -119,317 +287,367 @@ def read_file(file_path):
         print(f"Unsupported file type: {file_path}")
         sys.exit(1)
 
-def clean_text(text):
-    """Remove all occurrences of 'inaudible' (case-insensitive, with or without punctuation) from the text."""
-    return re.sub(r'\binaudible\b[.,;:!?"\'\-]*', '', text, flags=re.IGNORECASE)
+# Map expanded forms to contractions (normalized, no punctuation)
+CONTRACTIONS = {
+    'they are': 'theyre',
+    'we are': 'were',
+    'you are': 'youre',
+    'i am': 'im',
+    'do not': 'dont',
+    'does not': 'doesnt',
+    'did not': 'didnt',
+    'is not': 'isnt',
+    'are not': 'arent',
+    'was not': 'wasnt',
+    'were not': 'werent',
+    'we are not': 'werent',
+    'have not': 'havent',
+    'has not': 'hasnt',
+    'had not': 'hadnt',
+    'will not': 'wont',
+    'would not': 'wouldnt',
+    'should not': 'shouldnt',
+    'could not': 'couldnt',
+    'cannot': 'cant',
+    'can not': 'cant',
+    'it is': 'its',
+    'it will': 'itll',
+    'that is': 'thats',
+    'there is': 'theres',
+    'what is': 'whats',
+    'who is': 'whos',
+    'let us': 'lets',
+    'i will': 'ill',
+    'you will': 'youll',
+    'he will': 'hell',
+    'she will': 'shell',
+    'we will': 'well',
+    'they will': 'theyll',
+    'i have': 'ive',
+    'you have': 'youve',
+    'we have': 'weve',
+    'they have': 'theyve',
+    'should have': 'shouldve',
+    'would have': 'wouldve',
+    'could have': 'couldve',
+    'might have': 'mightve',
+    'must have': 'mustve',
+    'i would': 'id',
+    'you would': 'youd',
+    'he would': 'hed',
+    'she would': 'shed',
+    'we would': 'wed',
+    'they would': 'theyd',
+    'i had': 'id',
+    'you had': 'youd',
+    'he had': 'hed',
+    'she had': 'shed',
+    'we had': 'wed',
+    'they had': 'theyd',
+    # General English contractions
+    "aren't": "arent",
+    "can't": "cant",
+    "couldn't": "couldnt",
+    "didn't": "didnt",
+    "doesn't": "doesnt",
+    "don't": "dont",
+    "hadn't": "hadnt",
+    "hasn't": "hasnt",
+    "haven't": "havent",
+    "he'd": "hed",
+    "he'll": "hell",
+    "he's": "hes",
+    "i'd": "id",
+    "i'll": "ill",
+    "i'm": "im",
+    "i've": "ive",
+    "isn't": "isnt",
+    "it'd": "itd",
+    "it'll": "itll",
+    "it's": "its",
+    "let's": "lets",
+    "mightn't": "mightnt",
+    "mustn't": "mustnt",
+    "shan't": "shant",
+    "she'd": "shed",
+    "she'll": "shell",
+    "she's": "shes",
+    "shouldn't": "shouldnt",
+    "that's": "thats",
+    "there's": "theres",
+    "they'd": "theyd",
+    "they'll": "theyll",
+    "they're": "theyre",
+    "they've": "theyve",
+    "we'd": "wed",
+    "we're": "were",
+    "we've": "weve",
+    "weren't": "werent",
+    "what'll": "whatll",
+    "what're": "whatre",
+    "what's": "whats",
+    "what've": "whatve",
+    "where's": "wheres",
+    "who'd": "whod",
+    "who'll": "wholl",
+    "who're": "whore",
+    "who's": "whos",
+    "who've": "whove",
+    "won't": "wont",
+    "wouldn't": "wouldnt",
+    "you'd": "youd",
+    "you'll": "youll",
+    "you're": "youre",
+    "you've": "youve",
+}
 
-def contraction_map():
-    # Map expanded forms to contractions (normalized, no punctuation)
-    return {
-        'they are': 'theyre',
-        'we are': 'were',
-        'you are': 'youre',
-        'i am': 'im',
-        'do not': 'dont',
-        'does not': 'doesnt',
-        'did not': 'didnt',
-        'is not': 'isnt',
-        'are not': 'arent',
-        'was not': 'wasnt',
-        'were not': 'werent',
-        'have not': 'havent',
-        'has not': 'hasnt',
-        'had not': 'hadnt',
-        'will not': 'wont',
-        'would not': 'wouldnt',
-        'should not': 'shouldnt',
-        'could not': 'couldnt',
-        'cannot': 'cant',
-        'can not': 'cant',
-        'it is': 'its',
-        'it will': 'itll',
-        'that is': 'thats',
-        'there is': 'theres',
-        'what is': 'whats',
-        'who is': 'whos',
-        'let us': 'lets',
-        'i will': 'ill',
-        'you will': 'youll',
-        'he will': 'hell',
-        'she will': 'shell',
-        'we will': 'well',
-        'they will': 'theyll',
-        'i have': 'ive',
-        'you have': 'youve',
-        'we have': 'weve',
-        'they have': 'theyve',
-        'should have': 'shouldve',
-        'would have': 'wouldve',
-        'could have': 'couldve',
-        'might have': 'mightve',
-        'must have': 'mustve',
-        'i would': 'id',
-        'you would': 'youd',
-        'he would': 'hed',
-        'she would': 'shed',
-        'we would': 'wed',
-        'they would': 'theyd',
-        'i had': 'id',
-        'you had': 'youd',
-        'he had': 'hed',
-        'she had': 'shed',
-        'we had': 'wed',
-        'they had': 'theyd',
-        # General English contractions
-        "aren't": "arent",
-        "can't": "cant",
-        "couldn't": "couldnt",
-        "didn't": "didnt",
-        "doesn't": "doesnt",
-        "don't": "dont",
-        "hadn't": "hadnt",
-        "hasn't": "hasnt",
-        "haven't": "havent",
-        "he'd": "hed",
-        "he'll": "hell",
-        "he's": "hes",
-        "i'd": "id",
-        "i'll": "ill",
-        "i'm": "im",
-        "i've": "ive",
-        "isn't": "isnt",
-        "it'd": "itd",
-        "it'll": "itll",
-        "it's": "its",
-        "let's": "lets",
-        "mightn't": "mightnt",
-        "mustn't": "mustnt",
-        "shan't": "shant",
-        "she'd": "shed",
-        "she'll": "shell",
-        "she's": "shes",
-        "shouldn't": "shouldnt",
-        "that's": "thats",
-        "there's": "theres",
-        "they'd": "theyd",
-        "they'll": "theyll",
-        "they're": "theyre",
-        "they've": "theyve",
-        "we'd": "wed",
-        "we're": "were",
-        "we've": "weve",
-        "weren't": "werent",
-        "what'll": "whatll",
-        "what're": "whatre",
-        "what's": "whats",
-        "what've": "whatve",
-        "where's": "wheres",
-        "who'd": "whod",
-        "who'll": "wholl",
-        "who're": "whore",
-        "who's": "whos",
-        "who've": "whove",
-        "won't": "wont",
-        "wouldn't": "wouldnt",
-        "you'd": "youd",
-        "you'll": "youll",
-        "you're": "youre",
-        "you've": "youve",
-    }
+# Expanded forms (normalized like the text they are matched against) mapped to contractions;
+# apostrophe forms already normalize to their contraction, so they need no rewrite
+CONTRACTION_MAP = {normalize_text(expanded): contraction for expanded, contraction in CONTRACTIONS.items()
+                   if normalize_text(expanded) != contraction}
 
-def map_expanded_to_contraction(text):
-    """Replace expanded forms with contractions in the text (normalized, no punctuation)."""
-    mapping = contraction_map()
-    # Normalize text for matching (remove punctuation, lowercase)
-    def normalize_for_map(s):
-        s = unicodedata.normalize('NFKC', s)
-        s = ''.join(ch for ch in s if not unicodedata.category(ch).startswith('P'))
-        return s.lower()
-    text_norm = normalize_for_map(text)
-    for expanded, contraction in mapping.items():
-        expanded_norm = normalize_for_map(expanded)
-        text_norm = text_norm.replace(expanded_norm, contraction)
-    return text_norm
-
-def split_compound_words(text):
-    """Split relevant compound words into separated forms for better matching (case-insensitive, word boundaries)."""
-    compounds = {
-        # Amphibian/toad-related
-        'coldblooded': 'cold blooded',
-        'warmblooded': 'warm blooded',
-        'toadstool': 'toad stool',
-        'bullfrog': 'bull frog',
-        'tadpole': 'tad pole',
-        'treefrog': 'tree frog',
-        'springpeeper': 'spring peeper',
-        'woodfrog': 'wood frog',
-        'spadefoot': 'spade foot',
-        'newtlike': 'newt like',
-        'frogspawn': 'frog spawn',
-        'pondweed': 'pond weed',
-        'nighttime': 'night time',
-        'seethrough': 'see through',
-        'waterhole': 'water hole',
-        'rainforest': 'rain forest',
-        'sunbaked': 'sun baked',
-        'backbone': 'back bone',
-        'eggsac': 'egg sac',
-        'overwinter': 'over winter',
-        'underwater': 'under water',
-        'daylight': 'day light',
-        'earthworm': 'earth worm',
-        'insectlike': 'insect like',
-        'mouthpart': 'mouth part',
-        'tailfin': 'tail fin',
-        'webbedfeet': 'webbed feet',
-        'webbedfoot': 'webbed foot',
-        # General English compound words
-        'notebook': 'note book',
-        'blackboard': 'black board',
-        'classroom': 'class room',
-        'sunflower': 'sun flower',
-        'football': 'foot ball',
-        'basketball': 'basket ball',
-        'baseball': 'base ball',
-        'playground': 'play ground',
-        'schoolyard': 'school yard',
-        'lunchbox': 'lunch box',
-        'toothbrush': 'tooth brush',
-        'hairbrush': 'hair brush',
-        'bedroom': 'bed room',
-        'bathroom': 'bath room',
-        'livingroom': 'living room',
-        'diningroom': 'dining room',
-        'bookshelf': 'book shelf',
-        'bookshelves': 'book shelves',
-        'snowman': 'snow man',
-        'raincoat': 'rain coat',
-        'fireman': 'fire man',
-        'policeman': 'police man',
-        'mailbox': 'mail box',
-        'sandbox': 'sand box',
-        'doghouse': 'dog house',
-        'catfish': 'cat fish',
-        'goldfish': 'gold fish',
-        'starfish': 'star fish',
-        'cupcake': 'cup cake',
-        'birthdaycake': 'birthday cake',
-        'pancake': 'pan cake',
-        'cheesecake': 'cheese cake',
-        'popcorn': 'pop corn',
-        'peanutbutter': 'peanut butter',
-        'strawberry': 'straw berry',
-        'blueberry': 'blue berry',
-        'raspberry': 'rasp berry',
-        'blackberry': 'black berry',
-        'greenhouse': 'green house',
-        'lighthouse': 'light house',
-        'wheelchair': 'wheel chair',
-        'newspaper': 'news paper',
-        'airport': 'air port',
-        'rainbow': 'rain bow',
-        'moonlight': 'moon light',
-        'sunlight': 'sun light',
-        'starlight': 'star light',
-        'daydream': 'day dream',
-        'nightmare': 'night mare',
-        'overcoat': 'over coat',
-        'underdog': 'under dog',
-        'overhead': 'over head',
-        'underfoot': 'under foot',
-        'upstairs': 'up stairs',
-        'downstairs': 'down stairs',
-        'outdoors': 'out doors',
-        'indoors': 'in doors',
-        'outfield': 'out field',
-        'infield': 'in field',
-        'outlaw': 'out law',
-        'inlet': 'in let',
-        'outlet': 'out let',
-        'upset': 'up set',
-        'downpour': 'down pour',
-        'outcome': 'out come',
-        'income': 'in come',
-        'outbreak': 'out break',
-        'input': 'in put',
-        'output': 'out put',
-        'outlook': 'out look',
-        'insight': 'in sight',
-        'oversight': 'over sight',
-        'oversee': 'over see',
-        'overdo': 'over do',
-        'undo': 'un do',
-        'redo': 're do',
-        'preview': 'pre view',
-        'review': 're view',
-        'replay': 're play',
-        'retake': 're take',
-        'rebuild': 're build',
-        'recycle': 're cycle',
-        'recharge': 're charge',
-        'rearrange': 're arrange',
-        'reappear': 're appear',
-        'reapply': 're apply',
-        'reconnect': 're connect',
-        'reconsider': 're consider',
-        'reconstruct': 're construct',
-        'recount': 're count',
-        'recover': 're cover',
-        'recreate': 're create',
-        'redefine': 're define',
-        'rediscover': 're discover',
-        'reenter': 're enter',
-        'refill': 're fill',
-        'refocus': 're focus',
-        'refresh': 're fresh',
-        'regain': 're gain',
-        'regrow': 're grow',
-        'rehash': 're hash',
-        'reheat': 're heat',
-        'rejoin': 're join',
-        'relive': 're live',
-        'remake': 're make',
-        'rematch': 're match',
-        'remove': 're move',
-        'rename': 're name',
-        'renew': 're new',
-        'reopen': 're open',
-        'replace': 're place',
-        'replay': 're play',
-        'report': 're port',
-        'resend': 're send',
-        'reset': 're set',
-        'resign': 're sign',
-        'resist': 're sist',
-        'resolve': 're solve',
-        'resort': 're sort',
-        'resource': 're source',
-        'respect': 're spect',
-        'respond': 're spond',
-        'restart': 're start',
-        'restore': 're store',
-        'restrict': 're strict',
-        'result': 're sult',
-        'resume': 're sume',
-        'retake': 're take',
-        'retell': 're tell',
-        'retire': 're tire',
-        'return': 're turn',
-        'reuse': 're use',
-        'reveal': 're veal',
-        'revenge': 're venge',
-        'reverse': 're verse',
-        'review': 're view',
-        'revise': 're vise',
-        'revisit': 're visit',
-        'revoke': 're voke',
-        'reward': 're ward',
-        'rewind': 're wind',
-        'rewrite': 're write',
-    }
-    for compound, split in compounds.items():
-        text = re.sub(rf'\b{compound}\b', split, text, flags=re.IGNORECASE)
-    return text
+# Compound words and their separated forms (normalized, lowercase)
+COMPOUND_MAP = {
+    # Amphibian/toad-related
+    'coldblooded': 'cold blooded',
+    'warmblooded': 'warm blooded',
+    'toadstool': 'toad stool',
+    'bullfrog': 'bull frog',
+    'tadpole': 'tad pole',
+    'treefrog': 'tree frog',
+    'springpeeper': 'spring peeper',
+    'woodfrog': 'wood frog',
+    'spadefoot': 'spade foot',
+    'newtlike': 'newt like',
+    'frogspawn': 'frog spawn',
+    'pondweed': 'pond weed',
+    'nighttime': 'night time',
+    'seethrough': 'see through',
+    'waterhole': 'water hole',
+    'rainforest': 'rain forest',
+    'sunbaked': 'sun baked',
+    'backbone': 'back bone',
+    'eggsac': 'egg sac',
+    'overwinter': 'over winter',
+    'underwater': 'under water',
+    'daylight': 'day light',
+    'earthworm': 'earth worm',
+    'insectlike': 'insect like',
+    'mouthpart': 'mouth part',
+    'tailfin': 'tail fin',
+    'webbedfeet': 'webbed feet',
+    'webbedfoot': 'webbed foot',
+    # General English compound words
+    'notebook': 'note book',
+    'blackboard': 'black board',
+    'classroom': 'class room',
+    'sunflower': 'sun flower',
+    'football': 'foot ball',
+    'basketball': 'basket ball',
+    'baseball': 'base ball',
+    'playground': 'play ground',
+    'schoolyard': 'school yard',
+    'lunchbox': 'lunch box',
+    'toothbrush': 'tooth brush',
+    'hairbrush': 'hair brush',
+    'bedroom': 'bed room',
+    'bathroom': 'bath room',
+    'livingroom': 'living room',
+    'diningroom': 'dining room',
+    'bookshelf': 'book shelf',
+    'bookshelves': 'book shelves',
+    'snowman': 'snow man',
+    'raincoat': 'rain coat',
+    'fireman': 'fire man',
+    'policeman': 'police man',
+    'mailbox': 'mail box',
+    'sandbox': 'sand box',
+    'doghouse': 'dog house',
+    'catfish': 'cat fish',
+    'goldfish': 'gold fish',
+    'starfish': 'star fish',
+    'cupcake': 'cup cake',
+    'birthdaycake': 'birthday cake',
+    'pancake': 'pan cake',
+    'cheesecake': 'cheese cake',
+    'popcorn': 'pop corn',
+    'peanutbutter': 'peanut butter',
+    'strawberry': 'straw berry',
+    'blueberry': 'blue berry',
+    'raspberry': 'rasp berry',
+    'blackberry': 'black berry',
+    'greenhouse': 'green house',
+    'lighthouse': 'light house',
+    'wheelchair': 'wheel chair',
+    'newspaper': 'news paper',
+    'airport': 'air port',
+    'rainbow': 'rain bow',
+    'moonlight': 'moon light',
+    'sunlight': 'sun light',
+    'starlight': 'star light',
+    'daydream': 'day dream',
+    'nightmare': 'night mare',
+    'overcoat': 'over coat',
+    'underdog': 'under dog',
+    'overhead': 'over head',
+    'underfoot': 'under foot',
+    'upstairs': 'up stairs',
+    'downstairs': 'down stairs',
+    'outdoors': 'out doors',
+    'indoors': 'in doors',
+    'outfield': 'out field',
+    'infield': 'in field',
+    'outlaw': 'out law',
+    'inlet': 'in let',
+    'outlet': 'out let',
+    'upset': 'up set',
+    'downpour': 'down pour',
+    'outcome': 'out come',
+    'income': 'in come',
+    'outbreak': 'out break',
+    'input': 'in put',
+    'output': 'out put',
+    'outlook': 'out look',
+    'insight': 'in sight',
+    'oversight': 'over sight',
+    'oversee': 'over see',
+    'overdo': 'over do',
+    'undo': 'un do',
+    'redo': 're do',
+    'preview': 'pre view',
+    'review': 're view',
+    'replay': 're play',
+    'retake': 're take',
+    'rebuild': 're build',
+    'recycle': 're cycle',
+    'recharge': 're charge',
+    'rearrange': 're arrange',
+    'reappear': 're appear',
+    'reapply': 're apply',
+    'reconnect': 're connect',
+    'reconsider': 're consider',
+    'reconstruct': 're construct',
+    'recount': 're count',
+    'recover': 're cover',
+    'recreate': 're create',
+    'redefine': 're define',
+    'rediscover': 're discover',
+    'reenter': 're enter',
+    'refill': 're fill',
+    'refocus': 're focus',
+    'refresh': 're fresh',
+    'regain': 're gain',
+    'regrow': 're grow',
+    'rehash': 're hash',
+    'reheat': 're heat',
+    'rejoin': 're join',
+    'relive': 're live',
+    'remake': 're make',
+    'rematch': 're match',
+    'remove': 're move',
+    'rename': 're name',
+    'renew': 're new',
+    'reopen': 're open',
+    'replace': 're place',
+    'replay': 're play',
+    'report': 're port',
+    'resend': 're send',
+    'reset': 're set',
+    'resign': 're sign',
+    'resist': 're sist',
+    'resolve': 're solve',
+    'resort': 're sort',
+    'resource': 're source',
+    'respect': 're spect',
+    'respond': 're spond',
+    'restart': 're start',
+    'restore': 're store',
+    'restrict': 're strict',
+    'result': 're sult',
+    'resume': 're sume',
+    'retake': 're take',
+    'retell': 're tell',
+    'retire': 're tire',
+    'return': 're turn',
+    'reuse': 're use',
+    'reveal': 're veal',
+    'revenge': 're venge',
+    'reverse': 're verse',
+    'review': 're view',
+    'revise': 're vise',
+    'revisit': 're visit',
+    'revoke': 're voke',
+    'reward': 're ward',
+    'rewind': 're wind',
+    'rewrite': 're write',
+}
+
+# Gap between the words of an expanded form. Plain whitespace only, so an 'inaudible' marker between
+# the words blocks the contraction: the speaker may not have said the expanded form
+WORD_GAP = r'\s+'
+
+def alternation(keys, separator=' '):
+    """Build a regex matching any of the literal (space-separated) keys, shaped like a trie.
+    
+    Keys sharing a prefix (like the many 're...' compounds) share one branch, so the prefix is matched once instead
+    of once per key. Continuing down the trie is tried before stopping at a shorter key, so the longest key wins.
+    """
+    trie = {}
+    for key in keys:
+        node = trie
+        for char in key:
+            node = node.setdefault(char, {})
+        node[''] = {}  # A key ends here
+    
+    def branch_pattern(node):
+        branches = [(separator if char == ' ' else re.escape(char)) + branch_pattern(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return '(?:' + pattern + ')?' if '' in node else pattern
+    
+    return branch_pattern(trie)
+
+# Every rewrite applied to a normalized document, as one pattern: drop 'inaudible' markers (and the
+# whitespace after them), replace expanded forms with contractions, and split compound words
+PREPROCESS_RE = re.compile(
+    r'(?P<inaudible>\binaudible\b\s*)'
+    r'|\b(?P<contraction>' + alternation(CONTRACTION_MAP, WORD_GAP) + r')\b'
+    r'|\b(?P<compound>' + alternation(COMPOUND_MAP) + r')\b'
+)
+
+def preprocess_replacement(match):
+    """Return the replacement for one PREPROCESS_RE match, based on which rewrite matched."""
+    kind = match.lastgroup
+    if kind == 'inaudible':
+        return ''
+    if kind == 'contraction':
+        return CONTRACTION_MAP[' '.join(match.group(kind).split())]
+    return COMPOUND_MAP[match.group(kind)]
+
+def prepare_text(text):
+    """Normalize a document, then drop 'inaudible' markers, map expanded forms to contractions
+    and split compound words in a single regex pass."""
+    return PREPROCESS_RE.sub(preprocess_replacement, normalize_text(text))
+
+def iter_paragraphs(file_path):
+    """Yield the text of a .docx or .txt file one paragraph (line) at a time."""
+    if file_path.endswith('.txt'):
+        try:
+            # Decode as UTF-8 regardless of the platform's default encoding; undecodable bytes become U+FFFD
+            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+                yield from f
+        except Exception as e:
+            print(f"Error reading file {file_path}: {str(e)}")
+            sys.exit(1)
+    else:
+        yield from read_file(file_path).splitlines()
+
+def iter_words(file_path):
+    """Yield a document's prepared words paragraph by paragraph, interned, without building the whole prepared text."""
+    for paragraph in iter_paragraphs(file_path):
+        yield from map(sys.intern, prepare_text(paragraph).split())
 
 def main():
     # Check if base path exists
@@ -458,29 +676,24 @@ def main():
     
     # Get file paths from user using numbered selection
     file1 = get_valid_file_path(participant_dir, "\nEnter the number for the first .docx file: ", available_files)
-    file2 = get_valid_file_path(participant_dir, "Enter the number for the second .docx file: ", available_files)
+    other_files = get_valid_file_paths(participant_dir, "Enter the number(s) for the file(s) to compare against it: ", available_files)
     
     # Read documents
     print("\nReading documents...")
-    text1 = clean_text(read_file(file1))
-    text2 = clean_text(read_file(file2))
-    # Map expanded forms to contractions for analysis
-    text1 = map_expanded_to_contraction(text1)
-    text2 = map_expanded_to_contraction(text2)
-    # Split compound words for better matching
-    text1 = split_compound_words(text1)
-    text2 = split_compound_words(text2)
+    word_lists = [list(iter_words(file_path)) for file_path in [file1] + other_files]
     
     # Compare texts
     print("\nAnalyzing documents...")
-    results = compare_texts(text1, text2)
+    all_results = compare_many(word_lists[0], word_lists[1:])
     
     # Print results
     print("\n=== Comparison Results ===")
-    print(f"Total words in longer document: {results['total_words']}")
-    print(f"Number of matches: {results['num_matches']}")
-    print(f"Number of different words: {results['different_words']}")
-    print(f"Word order similarity: {results['word_order_similarity'] * 100:.2f}%")
+    for file_path, results in zip(other_files, all_results):
+        print(f"\n{os.path.basename(file1)} vs {os.path.basename(file_path)}")
+        print(f"Total words in longer document: {results['total_words']}")
+        print(f"Number of matches: {results['num_matches']}")
+        print(f"Number of different words: {results['different_words']}")
+        print(f"Word order similarity: {results['word_order_similarity'] * 100:.2f}%")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
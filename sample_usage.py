@@ -1,4 +1,4 @@
-from transcribe import transcribe_audio, resolve_file_path, AUDIO_DIR
+from transcribe import transcribe_audio, resolve_file_path, save_transcription, check_api_key, AUDIO_DIR
 import os
 
 def main():
@@ -6,6 +6,9 @@ def main():
     Sample script showing how to use the transcription functionality
     from another Python script.
     """
+    # Make sure the API key is set before asking for a file
+    check_api_key()
+    
     # Example: Transcribe an audio file
     print(f"You can place audio files in the '{AUDIO_DIR}/' directory for easy access.")
     audio_file = input("Enter the path to your audio file: ")
@@ -34,8 +37,7 @@ def main():
             if not output_file:
                 output_file = os.path.splitext(os.path.basename(resolved_path))[0] + "_transcription.txt"
             
-            with open(output_file, 'w') as f:
-                f.write(transcription)
+            save_transcription(output_file, transcription)
             print(f"Transcription saved to {output_file}")
 
 if __name__ == "__main__":
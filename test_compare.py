@@ -0,0 +1,47 @@
+import random
+
+from compare import lcs_length
+
+
+def reference_lcs_length(words1, words2):
+    """Textbook O(n*m) dynamic programme, one row at a time."""
+    previous = [0] * (len(words2) + 1)
+    for word1 in words1:
+        row = [0]
+        for j, word2 in enumerate(words2):
+            row.append(previous[j] + 1 if word1 == word2 else max(previous[j + 1], row[j]))
+        previous = row
+    return previous[-1]
+
+
+def random_words(rng, vocab_size, max_len):
+    return [f"w{rng.randrange(vocab_size)}" for _ in range(rng.randint(0, max_len))]
+
+
+def test_lcs_length_matches_reference():
+    rng = random.Random(0)
+    for _ in range(2000):
+        # Small vocabularies give many repeated words, large ones few matches
+        vocab_size = rng.choice([1, 2, 3, 5, 20, 200])
+        words1 = random_words(rng, vocab_size, 80)
+        words2 = random_words(rng, vocab_size, 80)
+        assert lcs_length(words1, words2) == reference_lcs_length(words1, words2), (words1, words2)
+
+
+def test_lcs_length_shared_prefix_and_suffix():
+    rng = random.Random(1)
+    for _ in range(500):
+        prefix = random_words(rng, 5, 10)
+        suffix = random_words(rng, 5, 10)
+        words1 = prefix + random_words(rng, 5, 30) + suffix
+        words2 = prefix + random_words(rng, 5, 30) + suffix
+        assert lcs_length(words1, words2) == reference_lcs_length(words1, words2), (words1, words2)
+
+
+def test_lcs_length_longer_than_a_machine_word():
+    rng = random.Random(2)
+    words1 = [f"w{rng.randrange(30)}" for _ in range(300)]
+    words2 = [f"w{rng.randrange(30)}" for _ in range(250)]
+    assert lcs_length(words1, words2) == reference_lcs_length(words1, words2)
+    assert lcs_length(words1, []) == 0
+    assert lcs_length(words1, words1) == len(words1)
@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+import visualize_comparison
+from visualize_comparison import align_paragraphs, split_into_pages
+
+
+@pytest.fixture(params=['indel', 'sequencematcher'])
+def word_diff(request, monkeypatch):
+    """Run a test with rapidfuzz's Indel (if installed) and with the SequenceMatcher fallback."""
+    if request.param == 'indel' and visualize_comparison.Indel is None:
+        pytest.skip("rapidfuzz is not installed")
+    if request.param == 'sequencematcher':
+        monkeypatch.setattr(visualize_comparison, 'Indel', None)
+
+
+def random_documents(rng):
+    """Two documents as lists of paragraphs, the second an edited copy of the first."""
+    vocab = [f"w{n}" for n in range(rng.choice([3, 10, 50]))]
+    paragraphs1 = [[rng.choice(vocab) for _ in range(rng.randint(1, 40))] for _ in range(rng.randint(0, 12))]
+    paragraphs2 = []
+    for paragraph in paragraphs1:
+        roll = rng.random()
+        if roll < 0.1:
+            continue  # Paragraph dropped
+        if roll < 0.4:
+            paragraph = [word for word in paragraph if rng.random() > 0.2]
+            paragraph += [rng.choice(vocab) for _ in range(rng.randint(0, 5))]
+        paragraphs2.append(list(paragraph))
+        if rng.random() < 0.1:
+            paragraphs2.append([rng.choice(vocab) for _ in range(rng.randint(1, 20))])  # Paragraph inserted
+    return paragraphs1, [paragraph for paragraph in paragraphs2 if paragraph]
+
+
+def line_pairs(opcodes):
+    """The (i, j) word pairs a page draws a line between, by tag."""
+    return [(tag, i, j) for tag, i1, i2, j1, j2 in opcodes if tag in ('equal', 'replace')
+            for i, j in zip(range(i1, i2), range(j1, j2))]
+
+
+def test_alignment_tiles_both_documents(word_diff):
+    rng = random.Random(0)
+    for _ in range(300):
+        paragraphs1, paragraphs2 = random_documents(rng)
+        words1 = [word for paragraph in paragraphs1 for word in paragraph]
+        words2 = [word for paragraph in paragraphs2 for word in paragraph]
+        i_end = j_end = 0
+        for tag, i1, i2, j1, j2 in align_paragraphs(paragraphs1, paragraphs2):
+            assert (i1, j1) == (i_end, j_end)
+            if tag == 'equal':
+                assert words1[i1:i2] == words2[j1:j2]
+            i_end, j_end = i2, j2
+        assert (i_end, j_end) == (len(words1), len(words2))
+
+
+def test_pages_tile_the_global_alignment(word_diff):
+    rng = random.Random(1)
+    for _ in range(300):
+        paragraphs1, paragraphs2 = random_documents(rng)
+        len1 = sum(map(len, paragraphs1))
+        len2 = sum(map(len, paragraphs2))
+        opcodes = align_paragraphs(paragraphs1, paragraphs2)
+        words_per_page = rng.choice([1, 2, 7, 25, 100])
+        pages = split_into_pages(opcodes, len1, len2, words_per_page)
+
+        shifted = []
+        i_end = j_end = 0
+        for i_start, page_i_end, j_start, page_j_end, page_opcodes in pages:
+            # Pages follow each other without gaps and stay within the size limit
+            assert (i_start, j_start) == (i_end, j_end)
+            assert page_i_end - i_start <= words_per_page
+            assert page_j_end - j_start <= words_per_page
+            for tag, i1, i2, j1, j2 in page_opcodes:
+                # Offsets are relative to the page and inside it
+                assert 0 <= i1 <= i2 <= page_i_end - i_start
+                assert 0 <= j1 <= j2 <= page_j_end - j_start
+                shifted.append((tag, i_start + i1, i_start + i2, j_start + j1, j_start + j2))
+            i_end, j_end = page_i_end, page_j_end
+        assert (i_end, j_end) == (len1, len2)
+
+        # Put back together, the pages draw exactly the lines of the whole-document alignment
+        assert line_pairs(shifted) == line_pairs(opcodes)
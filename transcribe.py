@@ -1,27 +1,205 @@
 import os
+import io
+import re
 import sys
 import argparse
-from openai import OpenAI
+import asyncio
+import subprocess
+import functools
+import bisect
+import tempfile
+import concurrent.futures
+from pathlib import Path
 from dotenv import load_dotenv
-from pydub import AudioSegment
+
+try:
+    import readline
+except ImportError:  # Not available on Windows
+    readline = None
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Read the API key once; check_api_key reports it if missing before any request is made
+API_KEY = os.getenv("OPENAI_API_KEY")
+
 # Define the default audio directory
 AUDIO_DIR = "audio_files"
 
 BASE_PATH = "/Users/armaanparikh/Documents/EBRL/RC"
 
-def convert_to_mp3(input_file, output_file=None):
-    """Convert audio file to mp3 format if needed"""
-    if not output_file:
-        output_file = os.path.splitext(input_file)[0] + '.mp3'
+# Whisper API upload limit (25 MB); a converted recording within it is sent as a single request
+MAX_UPLOAD_BYTES = 26214400
+# Longest chunk a bigger recording is cut into, and how many chunks are in flight at once
+CHUNK_DURATION_MS = 300000
+MAX_CONCURRENT_REQUESTS = 5
+SILENCE_THRESHOLD = "-30dB"  # Quieter than this counts as a pause between words
+MIN_PAUSE_SECONDS = 0.5  # Shortest pause chunks may be cut at
+
+# Number of files transcribed at once in --batch mode
+BATCH_WORKERS = 4
+
+# Whisper resamples everything to 16 kHz mono, so converted uploads don't need more than that
+UPLOAD_SAMPLE_RATE = 16000
+UPLOAD_BITRATE = "32k"
+# Clean-up applied in the same ffmpeg pass that encodes uploads: cut low rumble, even out the loudness,
+# then bring the rate back down (loudnorm works at 192 kHz internally)
+AUDIO_FILTERS = f"highpass=f=80,loudnorm=I=-16:TP=-1.5:LRA=11,aresample={UPLOAD_SAMPLE_RATE}"
+
+# Audio files offered for selection in a participant directory
+AUDIO_SUFFIXES = ('.mp3', '.wav')
+
+# Formats the Whisper API accepts as-is; anything else is converted to mp3 first
+WHISPER_FORMATS = {".mp3", ".wav", ".flac", ".m4a", ".mp4", ".mpeg", ".mpga", ".oga", ".ogg", ".webm"}
+# Uncompressed audio is converted anyway: the upload is the slow part (and is capped at 25 MB)
+UNCOMPRESSED_FORMATS = {".wav"}
+# Audio codecs that can be copied unchanged into a container Whisper accepts: codec -> (ffmpeg format, extension)
+REMUX_FORMATS = {
+    "mp3": ("mp3", ".mp3"),
+    "vorbis": ("ogg", ".ogg"),
+    "opus": ("ogg", ".ogg"),
+    "flac": ("flac", ".flac"),
+}
+
+def convert_to_mp3(input_file, bitrate=UPLOAD_BITRATE):
+    """Convert audio file to 16 kHz mono mp3 in memory, without writing it to disk"""
+    # Call ffmpeg directly and read the mp3 from its stdout; going through pydub would
+    # first decode the whole file into raw PCM in Python
+    cmd = [
+        'ffmpeg',
+        '-i', input_file,
+        '-vn',  # No video
+        '-ac', '1',  # Mono audio
+        '-af', AUDIO_FILTERS,
+        '-ar', str(UPLOAD_SAMPLE_RATE),
+        '-codec:a', 'libmp3lame',
+        '-b:a', bitrate,
+        '-f', 'mp3',
+        'pipe:1'
+    ]
+    result = subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    buffer = io.BytesIO(result.stdout)
+    # The upload takes its file name (and so its format) from .name
+    buffer.name = os.path.splitext(os.path.basename(input_file))[0] + '.mp3'
+    return buffer
+
+def find_pauses(media_file):
+    """Return the sorted midpoints (in seconds) of the pauses in a file's audio and its duration (None if unknown)"""
+    cmd = [
+        'ffmpeg',
+        '-i', media_file,
+        '-vn',
+        '-af', f'silencedetect=noise={SILENCE_THRESHOLD}:d={MIN_PAUSE_SECONDS}',
+        '-f', 'null', '-'
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    
+    duration = None
+    match = re.search(r'Duration: (\d+):(\d+):([\d.]+)', result.stderr)
+    if match:
+        hours, minutes, seconds = match.groups()
+        duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    
+    starts = [float(value) for value in re.findall(r'silence_start: (-?[\d.]+)', result.stderr)]
+    ends = [float(value) for value in re.findall(r'silence_end: (-?[\d.]+)', result.stderr)]
+    pauses = [(start + end) / 2 for start, end in zip(starts, ends)]
+    return pauses, duration
+
+def segment_options(media_file, chunk_duration_ms=CHUNK_DURATION_MS):
+    """Build ffmpeg segment muxer options that cut at pauses, keeping every chunk within chunk_duration_ms"""
+    max_seconds = chunk_duration_ms / 1000
+    pauses, duration = find_pauses(media_file)
+    if duration is None:
+        # Fixed-length chunks
+        return ['-segment_time', str(chunk_duration_ms // 1000)]
+    
+    # Cut each chunk at the last pause before it would get too long (or at the limit if there is none),
+    # so words aren't split across chunks
+    split_times = []
+    chunk_start = 0.0
+    while duration - chunk_start > max_seconds:
+        limit = chunk_start + max_seconds
+        index = bisect.bisect_right(pauses, limit) - 1
+        chunk_start = pauses[index] if index >= 0 and pauses[index] > chunk_start else limit
+        split_times.append(chunk_start)
+    
+    if not split_times:
+        return ['-segment_time', str(chunk_duration_ms // 1000)]
+    return ['-segment_times', ','.join(f"{split_time:.3f}" for split_time in split_times)]
+
+def split_for_upload(input_file, output_dir, bitrate=UPLOAD_BITRATE):
+    """
+    Convert an audio file to 16 kHz mono mp3 in output_dir and return the files to upload, in order: the
+    whole recording if it fits in one request, else chunks of at most CHUNK_DURATION_MS cut at pauses
+    """
+    # One filtered ffmpeg pass over the whole recording, so loudness is evened out across the file
+    # rather than chunk by chunk
+    upload_file = os.path.join(output_dir, 'upload.mp3')
+    cmd = [
+        'ffmpeg',
+        '-i', input_file,
+        '-vn',  # No video
+        '-ac', '1',  # Mono audio
+        '-af', AUDIO_FILTERS,
+        '-ar', str(UPLOAD_SAMPLE_RATE),
+        '-codec:a', 'libmp3lame',
+        '-b:a', bitrate,
+        upload_file
+    ]
+    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if os.path.getsize(upload_file) <= MAX_UPLOAD_BYTES:
+        return [upload_file]
     
-    audio = AudioSegment.from_file(input_file)
-    audio.export(output_file, format="mp3")
-    return output_file
+    # Too big for one request: cut the encoded stream at pauses, copying it rather than encoding it again
+    chunk_pattern = os.path.join(output_dir, 'chunk_%05d.mp3')
+    cmd = [
+        'ffmpeg',
+        '-i', upload_file,
+        '-c', 'copy',
+        '-f', 'segment',
+        *segment_options(upload_file),
+        '-reset_timestamps', '1',
+        chunk_pattern
+    ]
+    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return [os.path.join(output_dir, name) for name in sorted(os.listdir(output_dir)) if name.startswith('chunk_')]
 
+def probe_codec(input_file):
+    """Return the codec name of a file's first audio stream, or None if ffprobe can't tell"""
+    cmd = [
+        'ffprobe',
+        '-v', 'error',
+        '-select_streams', 'a:0',
+        '-show_entries', 'stream=codec_name',
+        '-of', 'csv=p=0',
+        input_file
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+    except FileNotFoundError:
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip() or None
+
+def remux_for_upload(input_file):
+    """
+    Copy a file's audio stream, without re-encoding, into an in-memory file in a format Whisper
+    accepts. Returns None if the codec can't be uploaded as it is.
+    """
+    remux = REMUX_FORMATS.get(probe_codec(input_file))
+    if remux is None:
+        return None
+    container, extension = remux
+    cmd = ['ffmpeg', '-i', input_file, '-vn', '-c:a', 'copy', '-f', container, 'pipe:1']
+    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    if result.returncode != 0:
+        return None
+    buffer = io.BytesIO(result.stdout)
+    buffer.name = os.path.splitext(os.path.basename(input_file))[0] + extension
+    return buffer
+
+@functools.lru_cache(maxsize=256)
 def resolve_file_path(file_path, audio_dir=None):
     """
     Resolve the file path. If it's a relative path that doesn't exist,
@@ -42,17 +220,40 @@ def resolve_file_path(file_path, audio_dir=None):
     return file_path
 
 def list_available_audio_files(directory):
-    """List all .mp3 and .wav files in the specified directory and return the list, excluding files that start with ~."""
-    files = [file for file in os.listdir(directory) if (file.endswith('.mp3') or file.endswith('.wav')) and not file.startswith('~')]
+    """List all .mp3 and .wav files in the specified directory and return them sorted, excluding files that start with ~."""
+    with os.scandir(directory) as entries:
+        files = [entry.name for entry in entries
+                 if entry.name.lower().endswith(AUDIO_SUFFIXES) and not entry.name.startswith('~') and entry.is_file()]
+    files.sort()
     print("\nAvailable audio files in the directory:")
     for idx, file in enumerate(files, 1):
         print(f"  {idx}. {file}")
     return files
 
+def enable_filename_completion(files):
+    """Let the user tab-complete file names from the list at the input prompt."""
+    if readline is None:
+        return
+    
+    def complete(text, state):
+        matches = [file for file in files if file.startswith(text)]
+        return matches[state] if state < len(matches) else None
+    
+    readline.set_completer(complete)
+    # Complete the whole input, so names containing '-' or spaces work
+    readline.set_completer_delims('')
+    # macOS Python links libedit, which uses a different binding syntax
+    if 'libedit' in (readline.__doc__ or ''):
+        readline.parse_and_bind("bind ^I rl_complete")
+    else:
+        readline.parse_and_bind("tab: complete")
+
 def get_valid_audio_file_path(directory, prompt, files=None):
-    """Get a valid .mp3 or .wav file path from user input, allowing selection by number."""
+    """Get a valid .mp3 or .wav file path from user input, allowing selection by number or (tab-completed) name."""
     if files is None:
         files = list_available_audio_files(directory)
+    file_set = set(files)
+    enable_filename_completion(files)
     while True:
         selection = input(prompt).strip()
         if selection.isdigit():
@@ -64,11 +265,10 @@ def get_valid_audio_file_path(directory, prompt, files=None):
         else:
             # Fallback: allow entering filename as before
             filename = selection
-            if not (filename.endswith('.mp3') or filename.endswith('.wav')):
+            if not filename.lower().endswith(AUDIO_SUFFIXES):
                 filename += '.mp3'  # default to .mp3
-            full_path = os.path.join(directory, filename)
-            if os.path.exists(full_path):
-                return full_path
+            if filename in file_set:
+                return os.path.join(directory, filename)
             else:
                 print(f"File not found: {filename}")
                 print("Please choose from the available files listed above.")
@@ -87,30 +287,45 @@ def get_participant_directory():
             print(f"Directory not found for participant: {participant}")
             print("Please check the participant name and try again.")
 
-def transcribe_audio(file_path, audio_dir=None):
-    """Transcribe audio file using OpenAI's Whisper model"""
-    # Check if API key is set
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key or api_key == "your_api_key_here":
+def check_api_key():
+    """Exit with a message if the OpenAI API key is not set. Call it once before transcribing;
+    transcribe_audio and transcribe_async don't check it themselves."""
+    if not API_KEY or API_KEY == "your_api_key_here":
         print("Error: OPENAI_API_KEY not set in .env file")
         print("Please set your OpenAI API key in the .env file")
         sys.exit(1)
+
+@functools.lru_cache(maxsize=None)
+def get_client():
+    """Create the OpenAI client once and reuse it (and its connection pool) for every request"""
+    # Imported on first use: openai alone takes a few hundred ms to import, which --help and
+    # the interactive prompts don't need
+    from openai import OpenAI
+    return OpenAI()
+
+def transcribe_audio(file_path, audio_dir=None):
+    """Transcribe audio file using OpenAI's Whisper model"""
+    # Get the shared OpenAI client
+    client = get_client()
     
-    # Initialize OpenAI client
-    client = OpenAI()
-    
-    # Resolve file path
+    # Resolve file path (a cache hit when the caller already resolved it)
     file_path = resolve_file_path(file_path, audio_dir)
     
-    # Convert file to mp3 if it's not already
-    if not file_path.endswith('.mp3'):
-        print(f"Converting {file_path} to mp3 format...")
-        file_path = convert_to_mp3(file_path)
+    # Convert file to mp3 in memory unless Whisper can take it as it is and it's already compressed
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension in WHISPER_FORMATS and extension not in UNCOMPRESSED_FORMATS:
+        audio_file = open(file_path, "rb")
+    else:
+        # Only the container needs to change if the codec is one Whisper reads
+        audio_file = remux_for_upload(file_path) if extension not in UNCOMPRESSED_FORMATS else None
+        if audio_file is None:
+            print(f"Converting {file_path} to mp3 format...")
+            audio_file = convert_to_mp3(file_path)
     
     print(f"Transcribing {file_path}...")
     
     try:
-        with open(file_path, "rb") as audio_file:
+        with audio_file:
             transcript = client.audio.transcriptions.create(
                 model="whisper-1",
                 file=audio_file
@@ -121,6 +336,116 @@ def transcribe_audio(file_path, audio_dir=None):
         print(f"Error during transcription: {str(e)}")
         return None
 
+async def transcribe_async(file_path, audio_dir=None, max_concurrent=MAX_CONCURRENT_REQUESTS, on_text=None):
+    """
+    Transcribe audio file with Whisper: in one request if the converted audio fits the upload limit,
+    else in chunks cut at pauses, sending up to max_concurrent chunks at once.
+    
+    If on_text is given, it is called as on_text(index, text) for each chunk in order, as soon as that
+    chunk and all earlier ones are transcribed.
+    """
+    from openai import AsyncOpenAI
+    
+    # Resolve file path
+    file_path = resolve_file_path(file_path, audio_dir)
+    
+    semaphore = asyncio.Semaphore(max_concurrent)
+    
+    with tempfile.TemporaryDirectory() as chunk_dir:
+        print(f"Converting {file_path} for upload...")
+        try:
+            chunk_files = await asyncio.to_thread(split_for_upload, file_path, chunk_dir)
+        except subprocess.CalledProcessError as e:
+            print(f"Error converting {file_path}: ffmpeg exited with status {e.returncode}")
+            return None
+        
+        async with AsyncOpenAI() as client:
+            async def transcribe_chunk(chunk_file):
+                async with semaphore:
+                    with open(chunk_file, "rb") as f:
+                        transcript = await client.audio.transcriptions.create(
+                            model="whisper-1",
+                            file=(os.path.basename(chunk_file), f.read())
+                        )
+                return transcript.text.strip()
+            
+            if len(chunk_files) > 1:
+                print(f"Transcribing {len(chunk_files)} chunks...")
+            else:
+                print(f"Transcribing {file_path}...")
+            tasks = [asyncio.create_task(transcribe_chunk(chunk_file)) for chunk_file in chunk_files]
+            texts = []
+            try:
+                # Await in chunk order so text can be handed on while later chunks are still in flight
+                for index, task in enumerate(tasks):
+                    texts.append(await task)
+                    if on_text is not None:
+                        on_text(index, texts[-1])
+            except Exception as e:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                print(f"Error during transcription: {str(e)}")
+                return None
+    
+    return " ".join(text for text in texts if text)
+
+def get_transcription_dir(file_path):
+    """Return the participant name and the directory (a Path) transcriptions of an audio file are saved in"""
+    audio_dir = Path(file_path).parent
+    in_audio_dir = audio_dir.name == 'Audio'
+    # Always use the participant directory name (parent of /Audio if in /Audio)
+    participant_dir = audio_dir.parent if in_audio_dir else audio_dir
+    # Save in /Transcription if audio was in /Audio, else in participant dir
+    transcription_dir = participant_dir / 'Transcription' if in_audio_dir else participant_dir
+    transcription_dir.mkdir(parents=True, exist_ok=True)
+    return participant_dir.name, transcription_dir
+
+def save_transcription(txt_path, transcription):
+    """Write a transcription as UTF-8, replacing any existing file atomically"""
+    # Write next to the target and rename, so a crash never leaves a half-written transcription
+    tmp_path = f"{txt_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8", buffering=1 << 20) as f:
+        f.write(transcription)
+    os.replace(tmp_path, txt_path)
+
+def transcribe_directory(directory, workers=BATCH_WORKERS):
+    """Transcribe every audio file in a directory concurrently and save each transcription"""
+    # Fail once up front rather than in every worker
+    check_api_key()
+    
+    available_files = list_available_audio_files(directory)
+    # Fallback: check /Audio subdirectory if no files found
+    if not available_files:
+        audio_subdir = os.path.join(directory, 'Audio')
+        if os.path.exists(audio_subdir):
+            available_files = list_available_audio_files(audio_subdir)
+            directory = audio_subdir
+    if not available_files:
+        print(f"No audio files found in {directory}")
+        sys.exit(1)
+    
+    file_paths = [os.path.join(directory, file) for file in available_files]
+    # The requests are network-bound, so threads are enough. Each file goes through transcribe_async
+    # in its own event loop, so files over the upload limit are chunked just as in single-file mode
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(asyncio.run, transcribe_async(file_path)): file_path for file_path in file_paths}
+        # Save each transcription as soon as it is done; one failed file doesn't stop the others
+        for future in concurrent.futures.as_completed(futures):
+            file_path = futures[future]
+            try:
+                transcription = future.result()
+                if not transcription:
+                    print(f"Transcription failed: {os.path.basename(file_path)}")
+                    continue
+                _, transcription_dir = get_transcription_dir(file_path)
+                txt_path = transcription_dir / f"{Path(file_path).stem}_transcription_whisper.txt"
+                save_transcription(txt_path, transcription)
+            except Exception as e:
+                print(f"Transcription failed: {os.path.basename(file_path)} ({str(e)})")
+                continue
+            print(f"Transcription saved to {txt_path}")
+
 def main():
     parser = argparse.ArgumentParser(
         description="Transcribe audio files using OpenAI's Whisper",
@@ -138,14 +463,26 @@ Examples:
   
   # List available files and transcribe interactively
   python transcribe.py
+  
+  # Transcribe every audio file in a directory, 8 at a time
+  python transcribe.py /path/to/participant --batch --workers 8
         """
     )
     parser.add_argument("file_path", nargs="?", help="Path to the audio file to transcribe")
     parser.add_argument("-o", "--output", help="Output text file path (optional)")
     parser.add_argument("-d", "--dir", help=f"Audio files directory (default: {AUDIO_DIR})", default=AUDIO_DIR)
+    parser.add_argument("--batch", action="store_true", help="Transcribe every audio file in the directory given as file_path (or the participant's directory)")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help=f"Files transcribed at once in --batch mode (default: {BATCH_WORKERS})")
     
     args = parser.parse_args()
     
+    # Fail before any prompts or audio processing if the key is missing
+    check_api_key()
+    
+    if args.batch:
+        transcribe_directory(args.file_path or get_participant_directory(), args.workers)
+        return
+    
     # Get the audio directory
     audio_dir = args.dir
     
@@ -179,31 +516,23 @@ Examples:
         print(f"Checked in current directory and {os.path.abspath(audio_dir)}")
         sys.exit(1)
     
-    # Transcribe the audio
-    transcription = transcribe_audio(file_path, audio_dir)
+    # Transcribe the audio, printing the text as it arrives
+    def print_chunk(index, text):
+        if index == 0:
+            print("\nTranscription:")
+            print("--------------")
+        if text:
+            print(text, flush=True)
+    
+    transcription = asyncio.run(transcribe_async(file_path, audio_dir, on_text=print_chunk))
     
     if transcription:
-        # Print the transcription before asking to save
-        print("\nTranscription:")
-        print("--------------")
-        print(transcription)
         # Ask user if they want to save the transcription as a .txt file in this directory
         save_choice = input("\nDo you want to save the transcription as a .txt file in this directory? (y/n): ").strip().lower()
         if save_choice == 'y':
-            # Always use the participant directory name (parent of /Audio if in /Audio)
-            audio_dir = os.path.dirname(file_path)
-            if os.path.basename(audio_dir) == 'Audio':
-                participant_dir = os.path.dirname(audio_dir)
-            else:
-                participant_dir = audio_dir
-            participant_name = os.path.basename(participant_dir)
-            # Save in /Transcription if audio was in /Audio, else in participant dir
-            transcription_dir = os.path.join(participant_dir, 'Transcription') if os.path.basename(audio_dir) == 'Audio' else participant_dir
-            if not os.path.exists(transcription_dir):
-                os.makedirs(transcription_dir)
-            txt_path = os.path.join(transcription_dir, f"{participant_name}_gi_p1_transcription_whisper.txt")
-            with open(txt_path, "w") as f:
-                f.write(transcription)
+            participant_name, transcription_dir = get_transcription_dir(file_path)
+            txt_path = transcription_dir / f"{participant_name}_gi_p1_transcription_whisper.txt"
+            save_transcription(txt_path, transcription)
             print(f"Transcription saved to {txt_path}")
     else:
         print("Transcription failed.")
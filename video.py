@@ -6,15 +6,28 @@ Optimized for speed and performance.
 """
 
 import os
+import re
 import sys
-import glob
 import time
+import asyncio
 import concurrent.futures
-from openai import OpenAI
+import contextlib
+import functools
+import hashlib
+import json
+import mmap
+import bisect
+import httpx
+import numpy as np
+from openai import OpenAI, AsyncOpenAI, APIConnectionError, InternalServerError, RateLimitError
 from dotenv import load_dotenv
-from pydub import AudioSegment
 import subprocess
 
+try:
+    from faster_whisper import WhisperModel, BatchedInferencePipeline
+except ImportError:
+    WhisperModel = BatchedInferencePipeline = None
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -22,32 +35,54 @@ load_dotenv()
 BASE_PATH = "/Users/armaanparikh/Documents/EBRL/RC"
 
 # Optimization settings
-MAX_WORKERS = 3  # Number of parallel transcription workers
+MAX_WORKERS = 10  # Number of chunks transcribed at once
 CHUNK_DURATION_MS = 300000  # 5 minutes per chunk (reduced from 10 for faster processing)
 AUDIO_BITRATE = "128k"  # Reduced bitrate for faster processing
 AUDIO_SAMPLE_RATE = "22050"  # Reduced sample rate for faster processing
+LOCAL_SAMPLE_RATE = 16000  # Whisper's native sample rate, used for PCM fed to the local model
+MAX_UPLOAD_BYTES = 26214400  # Whisper API upload limit (25MB)
+SHRINK_BITRATE = "64k"  # Extraction settings for audio too large at AUDIO_BITRATE but small enough at these (still above Whisper's 16kHz input)
+SHRINK_SAMPLE_RATE = "16000"
+SILENCE_THRESHOLD = "-30dB"  # Quieter than this counts as a pause between words
+MIN_PAUSE_SECONDS = 0.5  # Shortest pause chunks may be cut at
+
+# Transcription backend: "openai" (Whisper API) or "local" (faster-whisper on this machine, no upload limit)
+TRANSCRIPTION_BACKEND = os.getenv("TRANSCRIPTION_BACKEND", "openai")
+API_TIMEOUT = httpx.Timeout(60.0, connect=10.0)  # Per-request timeout for Whisper API calls
+API_MAX_RETRIES = 2
+CHUNK_ATTEMPTS = 3  # Tries per chunk before a file is given up on
+RETRY_BASE_DELAY = 2  # Seconds before the first chunk retry, doubling after each failure
+RETRY_MAX_DELAY = 30
+LOCAL_MODEL = "large-v3"
+LOCAL_BATCH_SIZE = 8  # Speech segments decoded together by the local model
+VERBOSE = os.getenv("VERBOSE", "1") != "0"  # Set VERBOSE=0 to hide per-step progress messages
+
+BANNER = "\n".join([
+    " /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\",
+    "/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\",
+    "\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /",
+    " \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/",
+    "",
+    "  EEEEE  BBBBB  RRRRR  L",
+    "  E      B   B  R   R  L",
+    "  EEEE   BBBB   RRRR   L",
+    "  E      B   B  R R    L",
+    "  EEEEE  BBBBB  R  R   LLLLL",
+    "",
+    " /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\",
+    "/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\",
+    "\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /",
+    " \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/",
+    "",
+    "=" * 60,
+    "    Video to MP3 Converter and Transcriber (Optimized)",
+    "=" * 60,
+    ""
+])
 
 def print_header():
     """Print a header for the application"""
-    print(" /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\")
-    print("/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\")
-    print("\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /")
-    print(" \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/")
-    print("")
-    print("  EEEEE  BBBBB  RRRRR  L")
-    print("  E      B   B  R   R  L")
-    print("  EEEE   BBBB   RRRR   L")
-    print("  E      B   B  R R    L")
-    print("  EEEEE  BBBBB  R  R   LLLLL")
-    print("")
-    print(" /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\")
-    print("/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\")
-    print("\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /\\  /")
-    print(" \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/  \\/")
-    print("")
-    print("=" * 60)
-    print("    Video to MP3 Converter and Transcriber (Optimized)")
-    print("=" * 60)
+    sys.stdout.write(BANNER)
 
 def print_success(message):
     """Print a success message"""
@@ -66,8 +101,9 @@ def print_error(message):
     print(f"✗ {message}")
 
 def print_progress(message):
-    """Print a progress message"""
-    print(f"→ {message}")
+    """Print a progress message (only when VERBOSE is enabled)"""
+    if VERBOSE:
+        print(f"→ {message}")
 
 def print_separator():
     """Print a decorative separator"""
@@ -111,23 +147,21 @@ def list_video_files(directory):
         directory (str): Directory to search for video files
     
     Returns:
-        list: List of video file paths
+        list: List of os.DirEntry objects for the video files, sorted by name
     """
-    video_files = []
-    
-    # Find all MP4 files (case insensitive)
-    mp4_files = glob.glob(os.path.join(directory, "*.mp4"))
-    mp4_files.extend(glob.glob(os.path.join(directory, "*.MP4")))
-    
-    video_files = mp4_files
-    return sorted(video_files)
+    # Single directory pass; the extension check is case insensitive. Hidden files are skipped, as glob
+    # did, so macOS AppleDouble files like '._clip.mp4' are not listed
+    with os.scandir(directory) as entries:
+        video_files = [entry for entry in entries
+                       if entry.is_file() and entry.name.lower().endswith('.mp4') and not entry.name.startswith('.')]
+    return sorted(video_files, key=lambda entry: entry.name)
 
 def display_video_files(video_files):
     """
     Display numbered list of video files
     
     Args:
-        video_files (list): List of video file paths
+        video_files (list): List of os.DirEntry objects for the video files
     """
     if not video_files:
         print_warning("No MP4 files found in this directory.")
@@ -136,31 +170,29 @@ def display_video_files(video_files):
     print(f"\nFound {len(video_files)} video file(s):")
     print_mini_separator()
     
-    for i, file_path in enumerate(video_files, 1):
-        filename = os.path.basename(file_path)
-        file_size = os.path.getsize(file_path) / (1024 * 1024)  # Size in MB
+    for i, entry in enumerate(video_files, 1):
+        file_size = entry.stat().st_size / (1024 * 1024)  # Size in MB
         
-        print(f"{i:2d}. [MP4] {filename} ({file_size:.1f} MB)")
+        print(f"{i:2d}. [MP4] {entry.name} ({file_size:.1f} MB)")
     
     print_mini_separator()
 
-def get_user_selection(video_files, max_selections=10):
+def get_user_selection(video_files):
     """
     Get user selection for files to process
     
     Args:
-        video_files (list): List of video file paths
-        max_selections (int): Maximum number of files user can select
+        video_files (list): List of os.DirEntry objects for the video files
     
     Returns:
-        list: List of selected file paths
+        list: The selected entries
     """
     if not video_files:
         return []
     
     selected_files = []
     
-    print(f"\nSelect up to {max_selections} files to process:")
+    print(f"\nSelect files to process:")
     print("   Enter numbers separated by spaces, or 'all' for all files")
     print("   Note: MP4 files will be converted to MP3 and then transcribed.")
     
@@ -175,25 +207,14 @@ def get_user_selection(video_files, max_selections=10):
                 print_success(f"Selected all {len(selected_files)} video files!")
                 break
             
-            # Parse user input
-            selections = user_input.split()
-            selected_indices = []
+            # Parse user input (repeated numbers are only processed once)
+            selections = list(dict.fromkeys(map(int, user_input.split())))
+            invalid = [selection for selection in selections if not 1 <= selection <= len(video_files)]
             
-            for selection in selections:
-                index = int(selection)
-                if 1 <= index <= len(video_files):
-                    selected_indices.append(index - 1)  # Convert to 0-based index
-                else:
-                    print_error(f"Invalid selection: {selection}. Please enter numbers between 1 and {len(video_files)}.")
-                    selected_indices = []
-                    break
-            
-            if selected_indices:
-                if len(selected_indices) > max_selections:
-                    print_error(f"Too many selections. Please select no more than {max_selections} files.")
-                    continue
-                
-                selected_files = [video_files[i] for i in selected_indices]
+            if invalid:
+                print_error(f"Invalid selection: {invalid[0]}. Please enter numbers between 1 and {len(video_files)}.")
+            elif selections:
+                selected_files = [video_files[selection - 1] for selection in selections]
                 print_success(f"Selected {len(selected_files)} file(s)!")
                 break
                 
@@ -205,13 +226,15 @@ def get_user_selection(video_files, max_selections=10):
     
     return selected_files
 
-def extract_audio_from_video(video_file, output_file=None):
+def extract_audio_from_video(video_file, output_file=None, bitrate=AUDIO_BITRATE, sample_rate=AUDIO_SAMPLE_RATE):
     """
     Extract audio from MP4 file using ffmpeg with optimized settings
     
     Args:
         video_file (str): Path to the input MP4 file
         output_file (str): Path to the output MP3 file (optional)
+        bitrate (str): MP3 bitrate
+        sample_rate (str): MP3 sample rate
     
     Returns:
         str: Path to the extracted MP3 file, or None if extraction failed
@@ -232,11 +255,13 @@ def extract_audio_from_video(video_file, output_file=None):
         # Use ffmpeg with optimized settings for faster processing
         cmd = [
             'ffmpeg',
+            '-threads', '0',  # Let ffmpeg use every core
             '-i', video_file,
             '-vn',  # No video
-            '-acodec', 'mp3',  # Audio codec
-            '-ab', AUDIO_BITRATE,  # Optimized bitrate
-            '-ar', AUDIO_SAMPLE_RATE,  # Optimized sample rate
+            '-c:a', 'libmp3lame',  # Audio codec
+            '-compression_level', '9',  # Fastest LAME search; CBR bitrate is unchanged
+            '-ab', bitrate,  # Optimized bitrate
+            '-ar', sample_rate,  # Optimized sample rate
             '-ac', '1',  # Mono audio (faster processing)
             '-y',  # Overwrite output file
             output_file
@@ -259,10 +284,314 @@ def extract_audio_from_video(video_file, output_file=None):
         print_error(f"Error extracting audio: {str(e)}")
         return None
 
+def probe_duration(media_file):
+    """
+    Get the duration of a media file with ffprobe
+    
+    Args:
+        media_file (str): Path to the audio or video file
+    
+    Returns:
+        float: Duration in seconds, or None if it could not be determined
+    """
+    cmd = ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'csv=p=0', media_file]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        return float(result.stdout.strip())
+    except (FileNotFoundError, ValueError):
+        return None
+
+def estimate_mp3_size(duration, bitrate):
+    """
+    Estimate the size of a constant-bitrate MP3
+    
+    Args:
+        duration (float): Duration in seconds
+        bitrate (str): MP3 bitrate, like "128k"
+    
+    Returns:
+        float: Size in bytes
+    """
+    return duration * int(bitrate.rstrip('k')) * 1000 / 8
+
+def decode_pcm_audio(video_file):
+    """
+    Decode a video's audio straight to 16 kHz mono float32 PCM for the local model,
+    skipping the MP3 encode and decode
+    
+    Args:
+        video_file (str): Path to the input MP4 file
+    
+    Returns:
+        numpy.ndarray: The audio samples, or None if decoding failed
+    """
+    filename = os.path.basename(video_file)
+    print(f"\nDecoding audio from: {filename}")
+    cmd = [
+        'ffmpeg',
+        '-i', video_file,
+        '-vn',
+        '-ac', '1',
+        '-ar', str(LOCAL_SAMPLE_RATE),
+        '-f', 'f32le',  # Raw little-endian float32 samples
+        '-'
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True)
+    except FileNotFoundError:
+        print_error("FFmpeg not found. Please install FFmpeg to extract audio from video files.")
+        return None
+    if result.returncode != 0:
+        print_error(f"FFmpeg error: {result.stderr.decode(errors='replace')}")
+        return None
+    audio = np.frombuffer(result.stdout, dtype=np.float32)
+    print_success(f"Audio decoded: {len(audio) / LOCAL_SAMPLE_RATE:.1f}s")
+    return audio
+
+def find_pauses(media_file):
+    """
+    Find the pauses in a file's audio with ffmpeg's silencedetect filter
+    
+    Args:
+        media_file (str): Path to the audio or video file
+    
+    Returns:
+        tuple: (sorted midpoints of the pauses in seconds, duration in seconds or None)
+    """
+    cmd = [
+        'ffmpeg',
+        '-i', media_file,
+        '-vn',
+        '-af', f'silencedetect=noise={SILENCE_THRESHOLD}:d={MIN_PAUSE_SECONDS}',
+        '-f', 'null', '-'
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    
+    duration = None
+    match = re.search(r'Duration: (\d+):(\d+):([\d.]+)', result.stderr)
+    if match:
+        hours, minutes, seconds = match.groups()
+        duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    
+    starts = [float(value) for value in re.findall(r'silence_start: (-?[\d.]+)', result.stderr)]
+    ends = [float(value) for value in re.findall(r'silence_end: (-?[\d.]+)', result.stderr)]
+    pauses = [(start + end) / 2 for start, end in zip(starts, ends)]
+    return pauses, duration
+
+def segment_options(media_file, chunk_duration_ms):
+    """
+    Build ffmpeg segment muxer options that cut at pauses, keeping every chunk within chunk_duration_ms
+    
+    Args:
+        media_file (str): Path to the audio or video file
+        chunk_duration_ms (int): Maximum duration of each chunk in milliseconds
+    
+    Returns:
+        list: ffmpeg arguments choosing the split points
+    """
+    max_seconds = chunk_duration_ms / 1000
+    pauses, duration = find_pauses(media_file)
+    if duration is None:
+        # Fixed-length chunks
+        return ['-segment_time', str(chunk_duration_ms // 1000)]
+    
+    # Cut each chunk at the last pause before it would get too long (or at the limit if there is none),
+    # so words aren't split across chunks
+    split_times = []
+    chunk_start = 0.0
+    while duration - chunk_start > max_seconds:
+        limit = chunk_start + max_seconds
+        index = bisect.bisect_right(pauses, limit) - 1
+        chunk_start = pauses[index] if index >= 0 and pauses[index] > chunk_start else limit
+        split_times.append(chunk_start)
+    
+    if not split_times:
+        return ['-segment_time', str(chunk_duration_ms // 1000)]
+    return ['-segment_times', ','.join(f"{split_time:.3f}" for split_time in split_times)]
+
+def collect_chunk_files(chunk_pattern):
+    """
+    Collect the numbered chunk files ffmpeg's segment muxer wrote
+    
+    Args:
+        chunk_pattern (str): Chunk filename pattern with a %03d placeholder, numbered from 1
+    
+    Returns:
+        list: List of paths to the chunk files
+    """
+    chunk_files = []
+    while os.path.exists(chunk_pattern % (len(chunk_files) + 1)):
+        chunk_files.append(chunk_pattern % (len(chunk_files) + 1))
+    
+    for i, chunk_filename in enumerate(chunk_files, 1):
+        print_progress(f"Created chunk {i}/{len(chunk_files)}: {os.path.basename(chunk_filename)}")
+    
+    return chunk_files
+
+def extract_audio_chunks(video_file, chunk_duration_ms=CHUNK_DURATION_MS):
+    """
+    Extract audio from MP4 file straight into MP3 chunks in a single ffmpeg pass
+    
+    Args:
+        video_file (str): Path to the input MP4 file
+        chunk_duration_ms (int): Duration of each chunk in milliseconds
+    
+    Returns:
+        list: List of paths to the chunk files, or an empty list if extraction failed
+    """
+    try:
+        filename = os.path.basename(video_file)
+        print(f"\nExtracting audio from: {filename}")
+        print_progress(f"Audio would exceed the 25MB limit even at {SHRINK_BITRATE}, extracting it directly into chunks...")
+        
+        chunk_pattern = f"{os.path.splitext(video_file)[0]}_chunk_%03d.mp3"
+        cmd = [
+            'ffmpeg',
+            '-threads', '0',  # Let ffmpeg use every core
+            '-i', video_file,
+            '-vn',  # No video
+            '-c:a', 'libmp3lame',  # Audio codec
+            '-compression_level', '9',  # Fastest LAME search; CBR bitrate is unchanged
+            '-ab', AUDIO_BITRATE,  # Optimized bitrate
+            '-ar', AUDIO_SAMPLE_RATE,  # Optimized sample rate
+            '-ac', '1',  # Mono audio (faster processing)
+            '-f', 'segment',
+            *segment_options(video_file, chunk_duration_ms),
+            '-segment_start_number', '1',
+            '-reset_timestamps', '1',
+            '-y',  # Overwrite output files
+            chunk_pattern
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            print_error(f"FFmpeg error: {result.stderr}")
+            return []
+        
+        return collect_chunk_files(chunk_pattern)
+        
+    except FileNotFoundError:
+        print_error("FFmpeg not found. Please install FFmpeg to extract audio from video files.")
+        return []
+    except Exception as e:
+        print_error(f"Error extracting audio: {str(e)}")
+        return []
+
+def transcription_settings():
+    """
+    Describe the settings that produced a transcription, to tell cached results apart
+    
+    Returns:
+        dict: Backend and model used for transcription
+    """
+    if TRANSCRIPTION_BACKEND == "local":
+        return {"backend": "local", "model": LOCAL_MODEL}
+    return {"backend": "openai", "model": "whisper-1"}
+
+def transcription_cache_path(video_file, cache_dir):
+    """
+    Get the cache file for a video, keyed by a SHA-256 hash of its contents
+    
+    Args:
+        video_file (str): Path to the input MP4 file
+        cache_dir (str): Directory holding cached transcriptions
+    
+    Returns:
+        str: Path to the video's cache file (which may not exist yet)
+    """
+    digest = hashlib.sha256()
+    # Hash through a memory map so the page cache serves the reads without copying into Python buffers
+    if os.path.getsize(video_file) > 0:
+        with open(video_file, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            digest.update(mapped)
+    return os.path.join(cache_dir, f"{digest.hexdigest()}.json")
+
+def load_cached_transcription(cache_path):
+    """
+    Load a cached transcription if it was made with the current settings
+    
+    Args:
+        cache_path (str): Path to the video's cache file
+    
+    Returns:
+        str: Cached transcription text, or None if there is none
+    """
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get("settings") != transcription_settings():
+        return None
+    return cached.get("text")
+
+def store_cached_transcription(cache_path, transcription):
+    """
+    Cache a transcription so reruns on the unchanged video can skip it
+    
+    Args:
+        cache_path (str): Path to the video's cache file
+        transcription (str): The transcribed text
+    """
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump({"text": transcription, "settings": transcription_settings()}, f)
+    except OSError as e:
+        print_warning(f"Could not cache transcription: {str(e)}")
+
+def prepare_video(video_file, cache_dir):
+    """
+    Look up a video's cached transcription, extracting its audio only if there is none
+    
+    Args:
+        video_file (str): Path to the input MP4 file
+        cache_dir (str): Directory holding cached transcriptions
+    
+    Returns:
+        tuple: (cache_path, cached_transcription, audio_file, chunk_files); the last three follow
+               extract_for_transcription and are None when the cache is used
+    """
+    cache_path = transcription_cache_path(video_file, cache_dir)
+    cached_transcription = load_cached_transcription(cache_path)
+    if cached_transcription is not None:
+        return (cache_path, cached_transcription, None, None)
+    return (cache_path, None, *extract_for_transcription(video_file))
+
+def extract_for_transcription(video_file):
+    """
+    Extract a video's audio in the form it will be transcribed in: PCM samples for the local
+    model, one MP3 if it fits in a single upload (at SHRINK_BITRATE if it would not at AUDIO_BITRATE),
+    otherwise straight into chunks
+    
+    Args:
+        video_file (str): Path to the input MP4 file
+    
+    Returns:
+        tuple: (audio, chunk_files), with the unused one None; both None if extraction failed.
+               audio is an MP3 path, or a PCM array for the local backend
+    """
+    if TRANSCRIPTION_BACKEND == "local":
+        return (decode_pcm_audio(video_file), None)
+    # Reuse a full MP3 left by an earlier run
+    if os.path.exists(os.path.splitext(video_file)[0] + '.mp3'):
+        return (extract_audio_from_video(video_file), None)
+    duration = probe_duration(video_file)
+    if duration is None or estimate_mp3_size(duration, AUDIO_BITRATE) <= MAX_UPLOAD_BYTES:
+        return (extract_audio_from_video(video_file), None)
+    if estimate_mp3_size(duration, SHRINK_BITRATE) <= MAX_UPLOAD_BYTES:
+        # Extracting once at a lower bitrate is cheaper than splitting and keeps the recording in one request
+        print_progress(f"Audio would exceed the 25MB limit, extracting it at {SHRINK_BITRATE} to fit in a single upload...")
+        return (extract_audio_from_video(video_file, bitrate=SHRINK_BITRATE, sample_rate=SHRINK_SAMPLE_RATE), None)
+    chunk_files = extract_audio_chunks(video_file)
+    return (None, chunk_files) if chunk_files else (None, None)
+
 def split_audio_file(audio_file, chunk_duration_ms=CHUNK_DURATION_MS):
     """
     Split a large audio file into smaller chunks with optimized settings
     
+    The chunks are cut at pauses, which costs one full decode pass over the file to
+    find them (see find_pauses); the split itself copies the MP3 frames without re-encoding.
+    
     Args:
         audio_file (str): Path to the audio file to split
         chunk_duration_ms (int): Duration of each chunk in milliseconds
@@ -273,46 +602,42 @@ def split_audio_file(audio_file, chunk_duration_ms=CHUNK_DURATION_MS):
     try:
         print_progress("Splitting large audio file into optimized chunks...")
         
-        # Load the audio file
-        audio = AudioSegment.from_file(audio_file)
-        
-        # Convert to mono for faster processing
-        audio = audio.set_channels(1)
-        
-        # Calculate number of chunks needed
-        total_duration = len(audio)
-        num_chunks = (total_duration + chunk_duration_ms - 1) // chunk_duration_ms
-        
-        chunk_files = []
-        base_name = os.path.splitext(audio_file)[0]
-        
-        for i in range(num_chunks):
-            start_time = i * chunk_duration_ms
-            end_time = min((i + 1) * chunk_duration_ms, total_duration)
-            
-            # Extract chunk
-            chunk = audio[start_time:end_time]
-            
-            # Create chunk filename
-            chunk_filename = f"{base_name}_chunk_{i+1:03d}.mp3"
-            
-            # Export chunk with optimized settings
-            chunk.export(chunk_filename, format="mp3", bitrate=AUDIO_BITRATE, parameters=["-ar", AUDIO_SAMPLE_RATE])
-            chunk_files.append(chunk_filename)
-            
-            print_progress(f"Created optimized chunk {i+1}/{num_chunks}: {os.path.basename(chunk_filename)}")
+        # Split with ffmpeg's segment muxer at the pauses segment_options found (that search
+        # decodes the file once); the split copies the MP3 frames, so nothing is re-encoded
+        chunk_pattern = f"{os.path.splitext(audio_file)[0]}_chunk_%03d.mp3"
+        cmd = [
+            'ffmpeg',
+            '-i', audio_file,
+            '-f', 'segment',
+            *segment_options(audio_file, chunk_duration_ms),
+            '-segment_start_number', '1',
+            '-reset_timestamps', '1',
+            '-c', 'copy',
+            '-y',  # Overwrite output files
+            chunk_pattern
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            print_error(f"FFmpeg error: {result.stderr}")
+            return []
         
-        return chunk_files
+        return collect_chunk_files(chunk_pattern)
         
+    except FileNotFoundError:
+        print_error("FFmpeg not found. Please install FFmpeg to split audio files.")
+        return []
     except Exception as e:
         print_error(f"Error splitting audio file: {str(e)}")
         return []
 
-def transcribe_chunk(chunk_file, chunk_index, total_chunks):
+async def transcribe_chunk_async(client, semaphore, chunk_file, chunk_index, total_chunks):
     """
-    Transcribe a single audio chunk
+    Transcribe a single audio chunk, retrying rate limits, server errors and dropped
+    connections with exponential backoff
     
     Args:
+        client (AsyncOpenAI): Client shared by all chunks of the file
+        semaphore (asyncio.Semaphore): Limits how many chunks are in flight at once
         chunk_file (str): Path to the audio chunk file
         chunk_index (int): Index of the chunk being processed
         total_chunks (int): Total number of chunks
@@ -320,36 +645,67 @@ def transcribe_chunk(chunk_file, chunk_index, total_chunks):
     Returns:
         tuple: (chunk_index, transcription_text) or (chunk_index, None) if failed
     """
-    # Check if API key is set
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key or api_key == "your_api_key_here":
-        return (chunk_index, None)
+    for attempt in range(1, CHUNK_ATTEMPTS + 1):
+        try:
+            async with semaphore:
+                print_progress(f"Transcribing chunk {chunk_index}/{total_chunks}...")
+                
+                with open(chunk_file, "rb") as audio_file:
+                    transcript = await client.audio.transcriptions.create(
+                        model="whisper-1",
+                        file=audio_file
+                    )
+            
+            print_success(f"Chunk {chunk_index} transcribed successfully")
+            return (chunk_index, transcript.text)
+            
+        except (RateLimitError, InternalServerError, APIConnectionError) as e:
+            if attempt == CHUNK_ATTEMPTS:
+                print_error(f"Error transcribing chunk {chunk_index} after {attempt} attempts: {str(e)}")
+                return (chunk_index, None)
+            # Wait outside the semaphore so other chunks can use the slot
+            delay = min(RETRY_BASE_DELAY * 2 ** (attempt - 1), RETRY_MAX_DELAY)
+            print_warning(f"Chunk {chunk_index} failed ({str(e)}), retrying in {delay}s...")
+            await asyncio.sleep(delay)
+        except Exception as e:
+            print_error(f"Error transcribing chunk {chunk_index}: {str(e)}")
+            return (chunk_index, None)
+
+async def transcribe_chunks_async(chunk_files, on_text=None):
+    """
+    Transcribe audio chunks concurrently over one shared connection pool
     
-    # Initialize OpenAI client
-    client = OpenAI()
+    Args:
+        chunk_files (list): List of paths to audio chunk files
+        on_text (callable): Optional on_text(index, text), called for each chunk in order as soon
+                            as it and all earlier chunks are transcribed; stops at the first failure
     
-    try:
-        print_progress(f"Transcribing chunk {chunk_index}/{total_chunks}...")
-        
-        with open(chunk_file, "rb") as audio_file:
-            transcript = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file
-            )
-        
-        print_success(f"Chunk {chunk_index} transcribed successfully")
-        return (chunk_index, transcript.text)
-        
-    except Exception as e:
-        print_error(f"Error transcribing chunk {chunk_index}: {str(e)}")
-        return (chunk_index, None)
+    Returns:
+        list: Transcription text for each chunk in order (None for failed chunks)
+    """
+    semaphore = asyncio.Semaphore(MAX_WORKERS)
+    # transcribe_chunk_async does its own retries, so the client doesn't retry as well
+    async with AsyncOpenAI(max_retries=0, timeout=API_TIMEOUT) as client:
+        tasks = [
+            asyncio.create_task(transcribe_chunk_async(client, semaphore, chunk_file, i + 1, len(chunk_files)))
+            for i, chunk_file in enumerate(chunk_files)
+        ]
+        transcriptions = []
+        # Await in chunk order so text can be handed on while later chunks are still in flight
+        for index, task in enumerate(tasks):
+            _, transcription = await task
+            transcriptions.append(transcription)
+            if on_text is not None and None not in transcriptions:
+                on_text(index, transcription)
+    return transcriptions
 
-def transcribe_audio_chunks_parallel(chunk_files):
+def transcribe_audio_chunks_parallel(chunk_files, on_text=None):
     """
     Transcribe multiple audio chunks in parallel for faster processing
     
     Args:
         chunk_files (list): List of paths to audio chunk files
+        on_text (callable): Optional callback for each chunk's text, see transcribe_chunks_async
     
     Returns:
         str: Combined transcription text, or None if transcription failed
@@ -357,23 +713,13 @@ def transcribe_audio_chunks_parallel(chunk_files):
     if not chunk_files:
         return None
     
-    transcriptions = [None] * len(chunk_files)
-    
-    # Use ThreadPoolExecutor for parallel transcription
-    with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        # Submit all transcription tasks
-        future_to_chunk = {
-            executor.submit(transcribe_chunk, chunk_file, i+1, len(chunk_files)): i 
-            for i, chunk_file in enumerate(chunk_files)
-        }
-        
-        # Collect results as they complete
-        for future in concurrent.futures.as_completed(future_to_chunk):
-            chunk_index, transcription = future.result()
-            if transcription is not None:
-                transcriptions[chunk_index-1] = transcription
-            else:
-                return None  # If any chunk fails, return None
+    # The requests are network-bound, so one event loop handles them all
+    # Every chunk runs to completion (with retries) before the file is judged
+    transcriptions = asyncio.run(transcribe_chunks_async(chunk_files, on_text))
+    failed_chunks = [str(i) for i, transcription in enumerate(transcriptions, 1) if transcription is None]
+    if failed_chunks:
+        print_error(f"Chunk(s) {', '.join(failed_chunks)} of {len(chunk_files)} could not be transcribed")
+        return None
     
     # Combine all transcriptions in order
     combined_transcription = " ".join(transcriptions)
@@ -394,30 +740,166 @@ def cleanup_chunk_files(chunk_files):
     except Exception as e:
         print_warning(f"Error cleaning up chunk files: {str(e)}")
 
-def transcribe_audio(file_path):
+def transcribe_chunk_files(chunk_files, on_text=None):
     """
-    Transcribe audio file using OpenAI's Whisper model
-    Handles large files by splitting into chunks if necessary
-    Optimized for speed with parallel processing
+    Transcribe audio chunks in parallel, then delete them
     
     Args:
-        file_path (str): Path to the audio file to transcribe
+        chunk_files (list): List of paths to audio chunk files
+        on_text (callable): Optional callback for each chunk's text, see transcribe_chunks_async
+    
+    Returns:
+        str: Combined transcription text, or None if transcription failed
+    """
+    # Transcribe chunks in parallel
+    transcription = transcribe_audio_chunks_parallel(chunk_files, on_text)
+    
+    # Clean up chunk files
+    cleanup_chunk_files(chunk_files)
+    
+    return transcription
+
+@functools.lru_cache(maxsize=None)
+def get_local_model():
+    """
+    Load the local faster-whisper model once, using int8 weights (with bf16 activations and
+    FlashAttention on GPUs that support them), and warm it up so the
+    first real file doesn't pay the one-time setup cost
+    
+    Returns:
+        WhisperModel: The loaded model
+    """
+    import ctranslate2
+    
+    flash_attention = False
+    if ctranslate2.get_cuda_device_count() > 0:
+        device, compute_type = "cuda", "int8_float16"
+        # bf16 support means an Ampere or newer GPU, which FlashAttention 2 also requires
+        if "int8_bfloat16" in ctranslate2.get_supported_compute_types("cuda"):
+            compute_type, flash_attention = "int8_bfloat16", True
+    else:
+        device, compute_type = "cpu", "int8"
+    print_progress(f"Loading Whisper {LOCAL_MODEL} on {device} ({compute_type})...")
+    model = WhisperModel(LOCAL_MODEL, device=device, compute_type=compute_type, num_workers=MAX_WORKERS,
+                         flash_attention=flash_attention)
+    # Decode one second of silence; segments are lazy, so consume them to actually run the model
+    segments, _ = model.transcribe(np.zeros(LOCAL_SAMPLE_RATE, dtype=np.float32), language="en")
+    for _ in segments:
+        pass
+    return model
+
+@functools.lru_cache(maxsize=None)
+def get_local_pipeline():
+    """
+    Wrap the local model in a pipeline that decodes several speech segments per batch
+    
+    Returns:
+        BatchedInferencePipeline: The batched pipeline
+    """
+    return BatchedInferencePipeline(model=get_local_model())
+
+def transcribe_local(audio):
+    """
+    Transcribe audio on this machine with faster-whisper
+    
+    Args:
+        audio (str or numpy.ndarray): Path to an audio file, or 16 kHz mono float32 samples
     
     Returns:
         str: Transcribed text, or None if transcription failed
     """
-    # Check if API key is set
+    if WhisperModel is None:
+        print_error("faster-whisper is not installed")
+        print_info("Install it with 'pip install faster-whisper' or set TRANSCRIPTION_BACKEND=openai")
+        return None
+    
+    print_progress("Transcribing audio locally...")
+    try:
+        # The pipeline cuts the audio at pauses (VAD) and encodes LOCAL_BATCH_SIZE segments at a time
+        segments, _ = get_local_pipeline().transcribe(audio, beam_size=5, batch_size=LOCAL_BATCH_SIZE)
+        # segments is a generator; the audio is decoded as it is consumed
+        return " ".join(segment.text.strip() for segment in segments)
+    except Exception as e:
+        print_error(f"Error during transcription: {str(e)}")
+        return None
+
+def api_key_is_set():
+    """
+    Check that the OpenAI API key is set, printing how to fix it if not
+    
+    Returns:
+        bool: True if the key is set
+    """
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key or api_key == "your_api_key_here":
         print_error("OPENAI_API_KEY not set in .env file")
         print_info("Please set your OpenAI API key in the .env file")
+        return False
+    return True
+
+@functools.lru_cache(maxsize=None)
+def get_client():
+    """
+    Create the OpenAI client once so every file reuses its connection pool
+    
+    Returns:
+        OpenAI: The shared client
+    """
+    return OpenAI(max_retries=API_MAX_RETRIES, timeout=API_TIMEOUT)
+
+def transcribe_single_file(file_path):
+    """
+    Transcribe an audio file that fits in one upload
+    
+    Args:
+        file_path (str): Path to the audio file to transcribe
+    
+    Returns:
+        str: Transcribed text, or None if transcription failed
+    """
+    print_progress("Transcribing audio...")
+    
+    # Get the shared OpenAI client
+    client = get_client()
+    
+    try:
+        with open(file_path, "rb") as audio_file:
+            transcript = client.audio.transcriptions.create(
+                model="whisper-1",
+                file=audio_file
+            )
+        
+        return transcript.text
+    except Exception as e:
+        print_error(f"Error during transcription: {str(e)}")
+        return None
+
+def transcribe_audio(file_path, on_text=None):
+    """
+    Transcribe audio file using OpenAI's Whisper model
+    Handles large files by splitting into chunks if necessary
+    Optimized for speed with parallel processing
+    
+    Args:
+        file_path (str or numpy.ndarray): Path to the audio file to transcribe, or PCM samples
+                                          for the local backend
+        on_text (callable): Optional callback for each chunk's text when the file is split,
+                            see transcribe_chunks_async
+    
+    Returns:
+        str: Transcribed text, or None if transcription failed
+    """
+    if TRANSCRIPTION_BACKEND == "local":
+        return transcribe_local(file_path)
+    
+    # Check if API key is set
+    if not api_key_is_set():
         return None
     
     # Check file size (25MB = 26,214,400 bytes)
     file_size = os.path.getsize(file_path)
-    max_size = 26214400  # 25MB in bytes
     
-    if file_size > max_size:
+    if file_size > MAX_UPLOAD_BYTES:
         print_warning(f"File size ({file_size / (1024*1024):.1f} MB) exceeds 25MB limit")
         print_info("Splitting file into optimized chunks for parallel transcription...")
         
@@ -426,31 +908,71 @@ def transcribe_audio(file_path):
         if not chunk_files:
             return None
         
-        # Transcribe chunks in parallel
-        transcription = transcribe_audio_chunks_parallel(chunk_files)
-        
-        # Clean up chunk files
-        cleanup_chunk_files(chunk_files)
-        
-        return transcription
+        return transcribe_chunk_files(chunk_files, on_text)
     else:
         # File is small enough, transcribe normally
-        print_progress("Transcribing audio...")
-        
-        # Initialize OpenAI client
-        client = OpenAI()
-        
-        try:
-            with open(file_path, "rb") as audio_file:
-                transcript = client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file
-                )
+        return transcribe_single_file(file_path)
+
+def get_transcription_path(original_video_file, participant_dir):
+    """
+    Get the path a video's transcription is saved to, creating the Transcription directory
+    
+    Args:
+        original_video_file (str): Path to the original video file
+        participant_dir (str): Participant directory path
+    
+    Returns:
+        str: Path to the transcription file
+    """
+    # Create Transcription directory if it doesn't exist
+    transcription_dir = os.path.join(participant_dir, 'Transcription')
+    os.makedirs(transcription_dir, exist_ok=True)
+    
+    # Generate filename based on original video file
+    video_filename = os.path.splitext(os.path.basename(original_video_file))[0]
+    participant_name = os.path.basename(participant_dir)
+    return os.path.join(transcription_dir, f"{participant_name}_{video_filename}_transcription_whisper.txt")
+
+def transcribe_to_file(audio_file, chunk_files, output_path):
+    """
+    Transcribe a video's audio, writing chunk texts to the transcription file in order as they
+    finish instead of only once the whole file is done
+    
+    Args:
+        audio_file (str or numpy.ndarray): Extracted audio (see extract_for_transcription)
+        chunk_files (list): Audio chunks, used instead of audio_file when given
+        output_path (str): Path to save the transcription to
+    
+    Returns:
+        str: Transcribed text, or None if transcription failed
+    """
+    # Write to a partial file so a failed run never leaves a truncated transcription behind
+    partial_path = output_path + ".partial"
+    written = []
+    try:
+        with open(partial_path, "w", encoding="utf-8") as f:
+            def write_text(index, text):
+                f.write(text if index == 0 else " " + text)
+                written.append(index)
             
-            return transcript.text
-        except Exception as e:
-            print_error(f"Error during transcription: {str(e)}")
-            return None
+            if chunk_files:
+                transcription = transcribe_chunk_files(chunk_files, on_text=write_text)
+            else:
+                transcription = transcribe_audio(audio_file, on_text=write_text)
+            if transcription and not written:
+                f.write(transcription)  # Transcribed in one piece
+    except BaseException:
+        # The partial file may never have been created (e.g. the open itself failed); keep the real error
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(partial_path)
+        raise
+    
+    if not transcription:
+        os.remove(partial_path)
+        return None
+    os.replace(partial_path, output_path)
+    print_success(f"Transcription saved: {os.path.basename(output_path)}")
+    return transcription
 
 def save_transcription(transcription, original_video_file, participant_dir):
     """
@@ -465,24 +987,13 @@ def save_transcription(transcription, original_video_file, participant_dir):
         str: Path to the saved transcription file
     """
     try:
-        # Create Transcription directory if it doesn't exist
-        transcription_dir = os.path.join(participant_dir, 'Transcription')
-        if not os.path.exists(transcription_dir):
-            os.makedirs(transcription_dir)
-        
-        # Generate filename based on original video file
-        video_filename = os.path.splitext(os.path.basename(original_video_file))[0]
-        participant_name = os.path.basename(participant_dir)
-        
-        # Create output filename
-        output_filename = f"{participant_name}_{video_filename}_transcription_whisper.txt"
-        output_path = os.path.join(transcription_dir, output_filename)
+        output_path = get_transcription_path(original_video_file, participant_dir)
         
         # Save transcription
         with open(output_path, "w", encoding="utf-8") as f:
             f.write(transcription)
         
-        print_success(f"Transcription saved: {output_filename}")
+        print_success(f"Transcription saved: {os.path.basename(output_path)}")
         return output_path
         
     except Exception as e:
@@ -495,6 +1006,10 @@ def main():
     """
     print_header()
     
+    # Check the API key once, before any files are selected or extracted
+    if TRANSCRIPTION_BACKEND != "local" and not api_key_is_set():
+        return
+    
     try:
         # Get participant directory
         participant_dir = get_participant_name()
@@ -509,7 +1024,7 @@ def main():
             return
         
         # Get user selection
-        selected_files = get_user_selection(video_files, max_selections=10)
+        selected_files = [entry.path for entry in get_user_selection(video_files)]
         
         if not selected_files:
             print_info("No files selected for processing.")
@@ -517,39 +1032,52 @@ def main():
         
         print_separator()
         print(f"Starting optimized processing of {len(selected_files)} file(s)...")
-        print_info(f"Optimization settings: {AUDIO_BITRATE} bitrate, {AUDIO_SAMPLE_RATE}Hz sample rate, {MAX_WORKERS} parallel workers")
+        print_info(f"Optimization settings: {AUDIO_BITRATE} bitrate, {AUDIO_SAMPLE_RATE}Hz sample rate, {MAX_WORKERS} concurrent chunk requests")
         print_separator()
         
         # Process selected files
         processed_files = []
         failed_files = []
         
-        for i, video_file in enumerate(selected_files, 1):
-            print(f"\nProcessing file {i}/{len(selected_files)}: {os.path.basename(video_file)}")
-            print_mini_separator()
+        # ffmpeg extraction (CPU) and transcription (network) use different resources, so the
+        # next file's audio is extracted in the background while the current one is transcribed
+        # Transcriptions are cached by video content, so unchanged videos are skipped on reruns
+        cache_dir = os.path.join(participant_dir, 'Transcription', '.cache')
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as extractor:
+            next_extraction = extractor.submit(prepare_video, selected_files[0], cache_dir)
             
-            # Step 1: Extract audio from video
-            audio_file = extract_audio_from_video(video_file)
-            if not audio_file:
-                failed_files.append(video_file)
-                continue
-            
-            # Step 2: Transcribe audio
-            transcription = transcribe_audio(audio_file)
-            if not transcription:
-                failed_files.append(video_file)
-                continue
-            
-            # Step 3: Display transcription
-            print(f"\nTranscription:")
-            print("-" * 40)
-            print(transcription)
-            print("-" * 40)
-            
-            # Step 4: Save transcription
-            save_transcription(transcription, video_file, participant_dir)
-            
-            processed_files.append(video_file)
+            for i, video_file in enumerate(selected_files, 1):
+                print(f"\nProcessing file {i}/{len(selected_files)}: {os.path.basename(video_file)}")
+                print_mini_separator()
+                
+                # Step 1: Extract audio from video (whole, or straight into chunks if too large)
+                cache_path, transcription, audio_file, chunk_files = next_extraction.result()
+                if i < len(selected_files):
+                    next_extraction = extractor.submit(prepare_video, selected_files[i], cache_dir)
+                
+                if transcription is not None:
+                    print_success("Video unchanged since its last transcription, using the cached text")
+                    save_transcription(transcription, video_file, participant_dir)
+                else:
+                    if audio_file is None and chunk_files is None:
+                        failed_files.append(video_file)
+                        continue
+                    
+                    # Step 2: Transcribe audio, saving each chunk's text as soon as it is ready
+                    output_path = get_transcription_path(video_file, participant_dir)
+                    transcription = transcribe_to_file(audio_file, chunk_files, output_path)
+                    if not transcription:
+                        failed_files.append(video_file)
+                        continue
+                    store_cached_transcription(cache_path, transcription)
+                
+                # Step 3: Display transcription
+                print(f"\nTranscription:")
+                print("-" * 40)
+                print(transcription)
+                print("-" * 40)
+                
+                processed_files.append(video_file)
         
         # Print summary
         print_separator()
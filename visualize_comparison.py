@@ -1,22 +1,39 @@
-import docx
+import matplotlib
 import matplotlib.pyplot as plt
 import numpy as np
-from difflib import SequenceMatcher
+try:
+    # Compiled (Cython) difflib.SequenceMatcher with the same API and results; the fastest of the three
+    from cydifflib import SequenceMatcher
+except ImportError:
+    try:
+        # C implementation of difflib.SequenceMatcher with the same API and results
+        from cdifflib import CSequenceMatcher as SequenceMatcher
+    except ImportError:
+        from difflib import SequenceMatcher
+try:
+    # Bit-parallel LCS diff in C++, much faster than SequenceMatcher on long transcripts
+    from rapidfuzz.distance import Indel
+except ImportError:
+    Indel = None
 import sys
 import os
 import string
-import re
-import unicodedata
+import itertools
+import bisect
+from collections import Counter
 from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.collections import LineCollection
+from compare import CACHE_DIR, FOLD_ACCENTS, PREPROCESS_RE, load_cache_entry, prepare_text, read_file, store_cache_entry
 
 # Define the base path for document comparison
 BASE_PATH = "/Users/armaanparikh/Documents/EBRL/RC"
 
-def normalize_word(word):
-    """Remove all Unicode punctuation and lowercase the word."""
-    word = unicodedata.normalize('NFKC', word)
-    word = ''.join(ch for ch in word if not unicodedata.category(ch).startswith('P'))
-    return word.lower()
+# On-disk cache of prepared paragraphs, one file per document, reused while its mtime and size and the
+# preprocessing rules are unchanged
+PARAGRAPHS_CACHE_DIR = os.path.join(CACHE_DIR, "paragraphs")
+
+# Paragraphs shorter than this (e.g. "okay" or a speaker label) never anchor the paragraph-level alignment
+MIN_ANCHOR_WORDS = 8
 
 def get_participant_directory():
     """Get participant name and return the full directory path."""
@@ -33,18 +50,6 @@ def get_participant_directory():
             print(f"Directory not found for participant: {participant}")
             print("Please check the participant name and try again.")
 
-def read_docx(file_path):
-    """Read a .docx file and return its text content."""
-    try:
-        doc = docx.Document(file_path)
-        full_text = []
-        for para in doc.paragraphs:
-            full_text.append(para.text)
-        return ' '.join(full_text)
-    except Exception as e:
-        print(f"Error reading file {file_path}: {str(e)}")
-        sys.exit(1)
-
 def list_available_files(directory):
     """List all .docx and .txt files in the specified directory and return the list, excluding files that start with ~."""
     files = [file for file in os.listdir(directory) if (file.endswith('.docx') or file.endswith('.txt')) and not file.startswith('~')]
@@ -77,387 +82,246 @@ def get_valid_file_path(directory, prompt, files=None):
                 print(f"File not found: {filename}")
                 print("Please choose from the available files listed above.")
 
-def visualize_word_comparison(text1, text2, file1_name, file2_name, file1_path):
-    """Create a visual representation of word comparisons between two texts."""
-    # Normalize and split texts into words for both display and comparison
-    words1 = text1.split()
-    words2 = text2.split()
-    normalized_words1 = [normalize_word(word) for word in words1]
-    normalized_words2 = [normalize_word(word) for word in words2]
+def indel_opcodes(ids1, ids2):
+    """Return SequenceMatcher-style opcodes for a minimal insert/delete alignment of two id lists.
+    
+    Indel only emits 'equal', 'delete' and 'insert'; each run of deletes and inserts between two equal blocks is
+    merged into one 'replace' (or kept as a single 'delete'/'insert'), as SequenceMatcher reports it.
+    """
+    opcodes = []
+    for tag, i1, i2, j1, j2 in Indel.opcodes(ids1, ids2):
+        if tag != 'equal' and opcodes and opcodes[-1][0] != 'equal':
+            _, i1, _, j1, _ = opcodes.pop()
+            tag = 'replace' if i1 < i2 and j1 < j2 else tag
+        opcodes.append((tag, i1, i2, j1, j2))
+    return opcodes
+
+def append_opcode(opcodes, opcode):
+    """Append an opcode, joining it to the previous one when both are matches."""
+    tag, i1, i2, j1, j2 = opcode
+    if tag == 'equal' and opcodes and opcodes[-1][0] == 'equal' and opcodes[-1][2] == i1 and opcodes[-1][4] == j1:
+        opcodes[-1] = ('equal', opcodes[-1][1], i2, opcodes[-1][3], j2)
+    else:
+        opcodes.append(opcode)
+
+def trigram_anchors(ids1, ids2):
+    """Find positions (i, j) where the same three words start, for trigrams that occur exactly once in each list.
+    
+    Returns the longest chain of such anchors that appear in the same order in both lists, minus any that overlap.
+    """
+    trigrams1 = list(zip(ids1, ids1[1:], ids1[2:]))
+    trigrams2 = list(zip(ids2, ids2[1:], ids2[2:]))
+    counts1 = Counter(trigrams1)
+    counts2 = Counter(trigrams2)
+    j_of = {trigram: j for j, trigram in enumerate(trigrams2) if counts2[trigram] == 1}
+    pairs = [(i, j_of[trigram]) for i, trigram in enumerate(trigrams1) if counts1[trigram] == 1 and trigram in j_of]
+    
+    # Longest run of pairs with increasing j (pairs are already ordered by i), by patience sorting
+    tails = []  # tails[k]: index in pairs of the pair with the smallest j ending an increasing run of length k + 1
+    tail_js = []  # The j of each of those pairs, for bisecting
+    previous = [None] * len(pairs)
+    for n, (_, j) in enumerate(pairs):
+        k = bisect.bisect_left(tail_js, j)
+        previous[n] = tails[k - 1] if k else None
+        if k == len(tails):
+            tails.append(n)
+            tail_js.append(j)
+        else:
+            tails[k] = n
+            tail_js[k] = j
+    chain = []
+    n = tails[-1] if tails else None
+    while n is not None:
+        chain.append(pairs[n])
+        n = previous[n]
+    chain.reverse()
+    
+    # Neighbouring anchors usually overlap (a shared run of five words holds three trigrams); keep the first
+    anchors = []
+    for i, j in chain:
+        if not anchors or (i >= anchors[-1][0] + 3 and j >= anchors[-1][1] + 3):
+            anchors.append((i, j))
+    return anchors
+
+def diff_words(ids1, ids2):
+    """Return word-level opcodes for two lists of word ids."""
+    if Indel is not None:
+        return indel_opcodes(ids1, ids2)
+    # SequenceMatcher is far slower and greedily takes the longest match first. Match the trigrams that occur
+    # once in each list first, and run it only on the stretches between them, so long stretches of matching
+    # transcript cost little more than a pass over the words.
+    # autojunk stays off: it would treat words like "the" as junk in documents over 200 words,
+    # and they are real anchors in a transcript.
+    opcodes = []
+    i_end = j_end = 0
+    for i, j in trigram_anchors(ids1, ids2) + [(len(ids1), len(ids2))]:
+        if i > i_end or j > j_end:
+            matcher = SequenceMatcher(None, ids1[i_end:i], ids2[j_end:j], autojunk=False)
+            for tag, gi1, gi2, gj1, gj2 in matcher.get_opcodes():
+                append_opcode(opcodes, (tag, i_end + gi1, i_end + gi2, j_end + gj1, j_end + gj2))
+        if i < len(ids1):
+            append_opcode(opcodes, ('equal', i, i + 3, j, j + 3))
+        i_end, j_end = i + 3, j + 3
+    return opcodes
+
+def align_paragraphs(paragraphs1, paragraphs2):
+    """Align two documents, given as lists of paragraphs (lists of words), and return word-level opcodes.
+    
+    Identical paragraphs are matched first, which is cheap because there are far fewer paragraphs than words.
+    Only the stretches between them are diffed word by word, and each one is much shorter than the whole document.
+    """
+    words1 = list(itertools.chain.from_iterable(paragraphs1))
+    words2 = list(itertools.chain.from_iterable(paragraphs2))
+    if words1 == words2:
+        # Identical documents (e.g. two runs of the same transcription) need no matcher
+        return [('equal', 0, len(words1), 0, len(words2))] if words1 else []
+    # Diff small integer ids instead of strings: ints hash to themselves and compare in one step.
+    # Equal words get equal ids, so the opcodes index the word lists exactly as before.
+    vocab = {}
+    ids1 = [vocab.setdefault(word, len(vocab)) for word in words1]
+    ids2 = [vocab.setdefault(word, len(vocab)) for word in words2]
+    starts1 = [0, *itertools.accumulate(map(len, paragraphs1))]
+    starts2 = [0, *itertools.accumulate(map(len, paragraphs2))]
     
-    max_words = max(len(normalized_words1), len(normalized_words2))
+    matcher = SequenceMatcher(
+        lambda paragraph: len(paragraph) < MIN_ANCHOR_WORDS,
+        list(map(tuple, paragraphs1)),
+        list(map(tuple, paragraphs2)),
+        autojunk=False,
+    )
+    opcodes = []
+    for tag, p1, p2, q1, q2 in matcher.get_opcodes():
+        i1, i2, j1, j2 = starts1[p1], starts1[p2], starts2[q1], starts2[q2]
+        if tag == 'equal':
+            block_opcodes = [('equal', 0, i2 - i1, 0, j2 - j1)]
+        else:
+            block_opcodes = diff_words(ids1[i1:i2], ids2[j1:j2])
+        for block_tag, bi1, bi2, bj1, bj2 in block_opcodes:
+            # Matches that run across a block boundary are joined
+            append_opcode(opcodes, (block_tag, i1 + bi1, i1 + bi2, j1 + bj1, j1 + bj2))
+    return opcodes
+
+def split_into_pages(opcodes, len1, len2, words_per_page):
+    """Cut a whole-document alignment into pages of at most words_per_page words per side.
+    
+    Pages only break between aligned positions, so every connecting line stays on one page. Returns a list of
+    (i_start, i_end, j_start, j_end, page_opcodes), with page_opcodes relative to the page's first words.
+    """
+    pages = []
+    page_opcodes = []
+    i_start = j_start = 0
+    for tag, i1, i2, j1, j2 in opcodes:
+        while True:
+            room = words_per_page - max(i1 - i_start, j1 - j_start)
+            if max(i2 - i1, j2 - j1) <= room:
+                page_opcodes.append((tag, i1 - i_start, i2 - i_start, j1 - j_start, j2 - j_start))
+                break
+            # Fill the page, advancing both sides together so matched pairs are never separated
+            i_cut, j_cut = i1 + min(room, i2 - i1), j1 + min(room, j2 - j1)
+            if room > 0:
+                page_opcodes.append((tag, i1 - i_start, i_cut - i_start, j1 - j_start, j_cut - j_start))
+            pages.append((i_start, i_cut, j_start, j_cut, page_opcodes))
+            page_opcodes = []
+            i_start, j_start = i1, j1 = i_cut, j_cut
+    if page_opcodes:
+        pages.append((i_start, len1, j_start, len2, page_opcodes))
+    return pages
+
+def draw_page(page_words1, page_words2, page_opcodes, file1_name, file2_name):
+    """Draw one page of the comparison (words side by side, lines between aligned words) and return its figure."""
+    rows = max(len(page_words1), len(page_words2))
+    # Create figure and axis, height proportional to number of words on this page
+    fig_height = max(5, 0.25 * rows)
+    fig, ax = plt.subplots(figsize=(12, fig_height))
+    # Fixed margins (about 1 inch on top for the legend and titles), so saving needs no tight-bbox pass
+    fig.subplots_adjust(left=0.02, right=0.98, top=1 - 1.0 / fig_height, bottom=0.3 / fig_height)
+    # Set up the plot
+    ax.set_xlim(-1, 2)
+    ax.set_ylim(-rows, 1)
+    ax.axis('off')
+    # Plot normalized words from first text
+    for i, word in enumerate(page_words1):
+        ax.text(0, -i, word, ha='right', va='center', fontsize=8)
+    # Plot normalized words from second text
+    for i, word in enumerate(page_words2):
+        ax.text(1, -i, word, ha='left', va='center', fontsize=8)
+    # Draw lines between matching words using normalized versions, one collection per color
+    # rather than one Line2D artist per pair
+    match_segments = []
+    different_segments = []
+    for tag, i1, i2, j1, j2 in page_opcodes:
+        if tag == 'equal':
+            match_segments.extend([(0, -i), (1, -j)] for i, j in zip(range(i1, i2), range(j1, j2)))
+        elif tag == 'replace':
+            different_segments.extend([(0, -i), (1, -j)] for i, j in zip(range(i1, i2), range(j1, j2)))
+    ax.add_collection(LineCollection(match_segments, colors='g', alpha=0.3, linewidths=0.5))
+    ax.add_collection(LineCollection(different_segments, colors='r', alpha=0.3, linewidths=0.5))
+    # Add titles
+    ax.text(0, 1, file1_name, ha='center', va='bottom', fontsize=12, fontweight='bold')
+    ax.text(1, 1, file2_name, ha='center', va='bottom', fontsize=12, fontweight='bold')
+    # Add legend
+    ax.plot([], [], 'g-', label='Matching words (ignoring case and punctuation)', alpha=0.3)
+    ax.plot([], [], 'r-', label='Different words', alpha=0.3)
+    fig.legend(loc='upper center', ncol=2)
+    return fig
+
+def pdf_settings(strings):
+    """Choose the PDF settings for a comparison of the given strings (words and file names).
+    
+    When every string fits the Latin-1-style encoding of the standard PDF fonts, those built-in fonts are used
+    instead of embedding a font subset, which makes pages faster to write and smaller. Any other character
+    (e.g. a fraction slash or non-Latin script) would turn into '?', so then the usual embedded font is kept.
+    """
+    try:
+        '\n'.join(strings).encode('cp1252')
+    except UnicodeEncodeError:
+        return {'pdf.use14corefonts': False}
+    return {'pdf.use14corefonts': True}
+
+def visualize_word_comparison(paragraphs1, paragraphs2, file1_name, file2_name, file1_path):
+    """Create a visual representation of word comparisons between two texts, given as lists of paragraphs
+    of normalized words."""
+    normalized_words1 = list(itertools.chain.from_iterable(paragraphs1))
+    normalized_words2 = list(itertools.chain.from_iterable(paragraphs2))
+    # Align the whole documents once, then cut the alignment into pages
+    opcodes = align_paragraphs(paragraphs1, paragraphs2)
     words_per_page = 100
-    num_pages = (max_words + words_per_page - 1) // words_per_page
+    pages = split_into_pages(opcodes, len(normalized_words1), len(normalized_words2), words_per_page)
+    page_args = [
+        (normalized_words1[i_start:i_end], normalized_words2[j_start:j_end], page_opcodes, file1_name, file2_name)
+        for i_start, i_end, j_start, j_end, page_opcodes in pages
+    ]
     
     # Prepare PDF output
     pdf_path = os.path.join(os.path.dirname(file1_path), f"comparison_{os.path.splitext(file1_name)[0]}_{os.path.splitext(file2_name)[0]}.pdf")
-    with PdfPages(pdf_path) as pdf:
-        for page in range(num_pages):
-            start = page * words_per_page
-            end = min((page + 1) * words_per_page, max_words)
-            # Slice the words for this page
-            page_words1 = normalized_words1[start:end]
-            page_words2 = normalized_words2[start:end]
-            # Create figure and axis, height proportional to number of words on this page
-            fig_height = max(5, 0.25 * (end - start))
-            fig, ax = plt.subplots(figsize=(15, fig_height))
-            # Set up the plot
-            ax.set_xlim(-1, 2)
-            ax.set_ylim(-len(page_words1), 1)
-            ax.axis('off')
-            # Plot normalized words from first text
-            for i, word in enumerate(page_words1):
-                ax.text(0, -i, word, ha='right', va='center', fontsize=8)
-            # Plot normalized words from second text
-            for i, word in enumerate(page_words2):
-                ax.text(1, -i, word, ha='left', va='center', fontsize=8)
-            # Draw lines between matching words using normalized versions
-            matcher = SequenceMatcher(None, page_words1, page_words2)
-            for tag, i1, i2, j1, j2 in matcher.get_opcodes():
-                if tag == 'equal':
-                    for i, j in zip(range(i1, i2), range(j1, j2)):
-                        ax.plot([0, 1], [-i, -j], 'g-', alpha=0.3, linewidth=0.5)
-                elif tag == 'replace':
-                    for i, j in zip(range(i1, i2), range(j1, j2)):
-                        ax.plot([0, 1], [-i, -j], 'r-', alpha=0.3, linewidth=0.5)
-            # Add titles
-            ax.text(0, 1, file1_name, ha='center', va='bottom', fontsize=12, fontweight='bold')
-            ax.text(1, 1, file2_name, ha='center', va='bottom', fontsize=12, fontweight='bold')
-            # Add legend
-            ax.plot([], [], 'g-', label='Matching words (ignoring case and punctuation)', alpha=0.3)
-            ax.plot([], [], 'r-', label='Different words', alpha=0.3)
-            ax.legend(loc='upper center', bbox_to_anchor=(0.5, 1.1), ncol=2)
-            # Save the figure to the PDF
-            pdf.savefig(fig, bbox_inches='tight')
+    rc = pdf_settings(normalized_words1 + normalized_words2 + [file1_name, file2_name])
+    with matplotlib.rc_context(rc), PdfPages(pdf_path) as pdf:
+        for args in page_args:
+            fig = draw_page(*args)
+            pdf.savefig(fig)
             plt.close(fig)
     print(f"\nVisualization saved as: {pdf_path}")
 
-def read_file(file_path):
-    """Read a .docx or .txt file and return its text content."""
-    if file_path.endswith('.docx'):
-        return read_docx(file_path)
-    elif file_path.endswith('.txt'):
-        try:
-            with open(file_path, 'r') as f:
-                return f.read()
-        except Exception as e:
-            print(f"Error reading file {file_path}: {str(e)}")
-            sys.exit(1)
-    else:
-        print(f"Unsupported file type: {file_path}")
-        sys.exit(1)
-
-def clean_text(text):
-    """Remove all occurrences of 'inaudible' (case-insensitive, with or without punctuation) from the text."""
-    return re.sub(r'\binaudible\b[.,;:!?"\'\-]*', '', text, flags=re.IGNORECASE)
+def split_paragraphs(text):
+    """Prepare a document paragraph (line) by paragraph, as compare.py does, and return the non-empty
+    paragraphs as lists of words."""
+    return [words for words in (prepare_text(paragraph).split() for paragraph in text.splitlines()) if words]
 
-def contraction_map():
-    # Map expanded forms to contractions (normalized, no punctuation)
-    return {
-        'they are': 'theyre',
-        'we are': 'were',
-        'you are': 'youre',
-        'i am': 'im',
-        'do not': 'dont',
-        'does not': 'doesnt',
-        'did not': 'didnt',
-        'is not': 'isnt',
-        'are not': 'arent',
-        'was not': 'wasnt',
-        'were not': 'werent',
-        'have not': 'havent',
-        'has not': 'hasnt',
-        'had not': 'hadnt',
-        'will not': 'wont',
-        'would not': 'wouldnt',
-        'should not': 'shouldnt',
-        'could not': 'couldnt',
-        'cannot': 'cant',
-        'can not': 'cant',
-        'it is': 'its',
-        'it will': 'itll',
-        'that is': 'thats',
-        'there is': 'theres',
-        'what is': 'whats',
-        'who is': 'whos',
-        'let us': 'lets',
-        'i will': 'ill',
-        'you will': 'youll',
-        'he will': 'hell',
-        'she will': 'shell',
-        'we will': 'well',
-        'they will': 'theyll',
-        'i have': 'ive',
-        'you have': 'youve',
-        'we have': 'weve',
-        'they have': 'theyve',
-        'should have': 'shouldve',
-        'would have': 'wouldve',
-        'could have': 'couldve',
-        'might have': 'mightve',
-        'must have': 'mustve',
-        'i would': 'id',
-        'you would': 'youd',
-        'he would': 'hed',
-        'she would': 'shed',
-        'we would': 'wed',
-        'they would': 'theyd',
-        'i had': 'id',
-        'you had': 'youd',
-        'he had': 'hed',
-        'she had': 'shed',
-        'we had': 'wed',
-        'they had': 'theyd',
-        # General English contractions
-        "aren't": "arent",
-        "can't": "cant",
-        "couldn't": "couldnt",
-        "didn't": "didnt",
-        "doesn't": "doesnt",
-        "don't": "dont",
-        "hadn't": "hadnt",
-        "hasn't": "hasnt",
-        "haven't": "havent",
-        "he'd": "hed",
-        "he'll": "hell",
-        "he's": "hes",
-        "i'd": "id",
-        "i'll": "ill",
-        "i'm": "im",
-        "i've": "ive",
-        "isn't": "isnt",
-        "it'd": "itd",
-        "it'll": "itll",
-        "it's": "its",
-        "let's": "lets",
-        "mightn't": "mightnt",
-        "mustn't": "mustnt",
-        "shan't": "shant",
-        "she'd": "shed",
-        "she'll": "shell",
-        "she's": "shes",
-        "shouldn't": "shouldnt",
-        "that's": "thats",
-        "there's": "theres",
-        "they'd": "theyd",
-        "they'll": "theyll",
-        "they're": "theyre",
-        "they've": "theyve",
-        "we'd": "wed",
-        "we're": "were",
-        "we've": "weve",
-        "weren't": "werent",
-        "what'll": "whatll",
-        "what're": "whatre",
-        "what's": "whats",
-        "what've": "whatve",
-        "where's": "wheres",
-        "who'd": "whod",
-        "who'll": "wholl",
-        "who're": "whore",
-        "who's": "whos",
-        "who've": "whove",
-        "won't": "wont",
-        "wouldn't": "wouldnt",
-        "you'd": "youd",
-        "you'll": "youll",
-        "you're": "youre",
-        "you've": "youve",
-    }
-
-def map_expanded_to_contraction(text):
-    """Replace expanded forms with contractions in the text (normalized, no punctuation)."""
-    mapping = contraction_map()
-    # Normalize text for matching (remove punctuation, lowercase)
-    def normalize_for_map(s):
-        s = unicodedata.normalize('NFKC', s)
-        s = ''.join(ch for ch in s if not unicodedata.category(ch).startswith('P'))
-        return s.lower()
-    text_norm = normalize_for_map(text)
-    for expanded, contraction in mapping.items():
-        expanded_norm = normalize_for_map(expanded)
-        text_norm = text_norm.replace(expanded_norm, contraction)
-    return text_norm
-
-def split_compound_words(text):
-    """Split relevant compound words into separated forms for better matching (case-insensitive, word boundaries)."""
-    compounds = {
-        # Amphibian/toad-related
-        'coldblooded': 'cold blooded',
-        'warmblooded': 'warm blooded',
-        'toadstool': 'toad stool',
-        'bullfrog': 'bull frog',
-        'tadpole': 'tad pole',
-        'treefrog': 'tree frog',
-        'springpeeper': 'spring peeper',
-        'woodfrog': 'wood frog',
-        'spadefoot': 'spade foot',
-        'newtlike': 'newt like',
-        'frogspawn': 'frog spawn',
-        'pondweed': 'pond weed',
-        'nighttime': 'night time',
-        'seethrough': 'see through',
-        'waterhole': 'water hole',
-        'rainforest': 'rain forest',
-        'sunbaked': 'sun baked',
-        'backbone': 'back bone',
-        'eggsac': 'egg sac',
-        'overwinter': 'over winter',
-        'underwater': 'under water',
-        'daylight': 'day light',
-        'earthworm': 'earth worm',
-        'insectlike': 'insect like',
-        'mouthpart': 'mouth part',
-        'tailfin': 'tail fin',
-        'webbedfeet': 'webbed feet',
-        'webbedfoot': 'webbed foot',
-        # General English compound words
-        'notebook': 'note book',
-        'blackboard': 'black board',
-        'classroom': 'class room',
-        'sunflower': 'sun flower',
-        'football': 'foot ball',
-        'basketball': 'basket ball',
-        'baseball': 'base ball',
-        'playground': 'play ground',
-        'schoolyard': 'school yard',
-        'lunchbox': 'lunch box',
-        'toothbrush': 'tooth brush',
-        'hairbrush': 'hair brush',
-        'bedroom': 'bed room',
-        'bathroom': 'bath room',
-        'livingroom': 'living room',
-        'diningroom': 'dining room',
-        'bookshelf': 'book shelf',
-        'bookshelves': 'book shelves',
-        'snowman': 'snow man',
-        'raincoat': 'rain coat',
-        'fireman': 'fire man',
-        'policeman': 'police man',
-        'mailbox': 'mail box',
-        'sandbox': 'sand box',
-        'doghouse': 'dog house',
-        'catfish': 'cat fish',
-        'goldfish': 'gold fish',
-        'starfish': 'star fish',
-        'cupcake': 'cup cake',
-        'birthdaycake': 'birthday cake',
-        'pancake': 'pan cake',
-        'cheesecake': 'cheese cake',
-        'popcorn': 'pop corn',
-        'peanutbutter': 'peanut butter',
-        'strawberry': 'straw berry',
-        'blueberry': 'blue berry',
-        'raspberry': 'rasp berry',
-        'blackberry': 'black berry',
-        'greenhouse': 'green house',
-        'lighthouse': 'light house',
-        'wheelchair': 'wheel chair',
-        'newspaper': 'news paper',
-        'airport': 'air port',
-        'rainbow': 'rain bow',
-        'moonlight': 'moon light',
-        'sunlight': 'sun light',
-        'starlight': 'star light',
-        'daydream': 'day dream',
-        'nightmare': 'night mare',
-        'overcoat': 'over coat',
-        'underdog': 'under dog',
-        'overhead': 'over head',
-        'underfoot': 'under foot',
-        'upstairs': 'up stairs',
-        'downstairs': 'down stairs',
-        'outdoors': 'out doors',
-        'indoors': 'in doors',
-        'outfield': 'out field',
-        'infield': 'in field',
-        'outlaw': 'out law',
-        'inlet': 'in let',
-        'outlet': 'out let',
-        'upset': 'up set',
-        'downpour': 'down pour',
-        'outcome': 'out come',
-        'income': 'in come',
-        'outbreak': 'out break',
-        'input': 'in put',
-        'output': 'out put',
-        'outlook': 'out look',
-        'insight': 'in sight',
-        'oversight': 'over sight',
-        'oversee': 'over see',
-        'overdo': 'over do',
-        'undo': 'un do',
-        'redo': 're do',
-        'preview': 'pre view',
-        'review': 're view',
-        'replay': 're play',
-        'retake': 're take',
-        'rebuild': 're build',
-        'recycle': 're cycle',
-        'recharge': 're charge',
-        'rearrange': 're arrange',
-        'reappear': 're appear',
-        'reapply': 're apply',
-        'reconnect': 're connect',
-        'reconsider': 're consider',
-        'reconstruct': 're construct',
-        'recount': 're count',
-        'recover': 're cover',
-        'recreate': 're create',
-        'redefine': 're define',
-        'rediscover': 're discover',
-        'reenter': 're enter',
-        'refill': 're fill',
-        'refocus': 're focus',
-        'refresh': 're fresh',
-        'regain': 're gain',
-        'regrow': 're grow',
-        'rehash': 're hash',
-        'reheat': 're heat',
-        'rejoin': 're join',
-        'relive': 're live',
-        'remake': 're make',
-        'rematch': 're match',
-        'remove': 're move',
-        'rename': 're name',
-        'renew': 're new',
-        'reopen': 're open',
-        'replace': 're place',
-        'replay': 're play',
-        'report': 're port',
-        'resend': 're send',
-        'reset': 're set',
-        'resign': 're sign',
-        'resist': 're sist',
-        'resolve': 're solve',
-        'resort': 're sort',
-        'resource': 're source',
-        'respect': 're spect',
-        'respond': 're spond',
-        'restart': 're start',
-        'restore': 're store',
-        'restrict': 're strict',
-        'result': 're sult',
-        'resume': 're sume',
-        'retake': 're take',
-        'retell': 're tell',
-        'retire': 're tire',
-        'return': 're turn',
-        'reuse': 're use',
-        'reveal': 're veal',
-        'revenge': 're venge',
-        'reverse': 're verse',
-        'review': 're view',
-        'revise': 're vise',
-        'revisit': 're visit',
-        'revoke': 're voke',
-        'reward': 're ward',
-        'rewind': 're wind',
-        'rewrite': 're write',
-    }
-    for compound, split in compounds.items():
-        text = re.sub(rf'\b{compound}\b', split, text, flags=re.IGNORECASE)
-    return text
+def load_paragraphs(file_path):
+    """Return a document's prepared paragraphs, using the on-disk cache when the file is unchanged since it was stored."""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return split_paragraphs(read_file(file_path))  # Reports the error
+    abs_path = os.path.abspath(file_path)
+    # The accent flag and pattern are stored too, so changing the normalization or editing the contraction
+    # or compound lists invalidates old entries
+    key = (stat.st_mtime_ns, stat.st_size, FOLD_ACCENTS, PREPROCESS_RE.pattern)
+    paragraphs = load_cache_entry(PARAGRAPHS_CACHE_DIR, abs_path, key)
+    if paragraphs is None:
+        paragraphs = split_paragraphs(read_file(abs_path))
+        store_cache_entry(PARAGRAPHS_CACHE_DIR, abs_path, key, paragraphs)
+    return paragraphs
 
 def main():
     # Check if base path exists
@@ -490,20 +354,16 @@ def main():
     
     # Read documents
     print("\nReading documents...")
-    text1 = clean_text(read_file(file1))
-    text2 = clean_text(read_file(file2))
-    # Map expanded forms to contractions for analysis
-    text1 = map_expanded_to_contraction(text1)
-    text2 = map_expanded_to_contraction(text2)
-    # Split compound words for better matching
-    text1 = split_compound_words(text1)
-    text2 = split_compound_words(text2)
+    # Normalize, drop 'inaudible' markers, map expanded forms to contractions, split compound words
+    # and break each document into paragraphs of words
+    paragraphs1 = load_paragraphs(file1)
+    paragraphs2 = load_paragraphs(file2)
     
     # Create visualization
     print("\nCreating visualization...")
     visualize_word_comparison(
-        text1, 
-        text2, 
+        paragraphs1, 
+        paragraphs2, 
         os.path.basename(file1), 
         os.path.basename(file2),
         file1
@@ -6,9 +6,8 @@ Converts WMA and DSS audio files to MP3 format in the RC participant directory s
 
 import os
 import sys
-import glob
-import time
-from pydub import AudioSegment
+import concurrent.futures
+import subprocess
 
 def print_header():
     """Print a fun header for the application"""
@@ -95,27 +94,22 @@ def list_audio_files(directory):
         directory (str): Directory to search for audio files
     
     Returns:
-        list: List of audio file paths
+        list: List of os.DirEntry objects for the audio files, sorted by name
     """
-    audio_files = []
-    
-    # Find all WMA, DSS, and MP3 files (case insensitive)
-    wma_files = glob.glob(os.path.join(directory, "*.wma"))
-    wma_files.extend(glob.glob(os.path.join(directory, "*.WMA")))
-    dss_files = glob.glob(os.path.join(directory, "*.dss"))
-    dss_files.extend(glob.glob(os.path.join(directory, "*.DSS")))
-    mp3_files = glob.glob(os.path.join(directory, "*.mp3"))
-    mp3_files.extend(glob.glob(os.path.join(directory, "*.MP3")))
-    
-    audio_files = wma_files + dss_files + mp3_files
-    return sorted(audio_files)
+    # Single directory pass; the extension check is case insensitive. Hidden files are skipped, as glob
+    # did, so macOS AppleDouble files like '._memo.wma' are not listed
+    with os.scandir(directory) as entries:
+        audio_files = [entry for entry in entries
+                       if entry.is_file() and entry.name.lower().endswith(('.wma', '.dss', '.mp3'))
+                       and not entry.name.startswith('.')]
+    return sorted(audio_files, key=lambda entry: entry.name)
 
 def display_audio_files(audio_files):
     """
     Display numbered list of audio files with fun formatting
     
     Args:
-        audio_files (list): List of audio file paths
+        audio_files (list): List of os.DirEntry objects for the audio files
     """
     if not audio_files:
         print_warning("No audio files (.wma, .dss, or .mp3) found in this directory.")
@@ -124,9 +118,9 @@ def display_audio_files(audio_files):
     print(f"\nFound {len(audio_files)} audio file(s):")
     print_mini_separator()
     
-    for i, file_path in enumerate(audio_files, 1):
-        filename = os.path.basename(file_path)
-        file_size = os.path.getsize(file_path) / (1024 * 1024)  # Size in MB
+    for i, entry in enumerate(audio_files, 1):
+        filename = entry.name
+        file_size = entry.stat().st_size / (1024 * 1024)  # Size in MB
         file_ext = os.path.splitext(filename)[1].lower()
         
         # Add file type indicator
@@ -148,11 +142,11 @@ def get_user_selection(audio_files, max_selections=3):
     Get user selection for files to convert
     
     Args:
-        audio_files (list): List of audio file paths
+        audio_files (list): List of os.DirEntry objects for the audio files
         max_selections (int): Maximum number of files user can select
     
     Returns:
-        list: List of selected file paths
+        list: The selected entries
     """
     if not audio_files:
         return []
@@ -170,7 +164,7 @@ def get_user_selection(audio_files, max_selections=3):
             
             if user_input.lower() == 'all':
                 # Select all WMA and DSS files
-                selected_files = [f for f in audio_files if f.lower().endswith(('.wma', '.dss'))]
+                selected_files = [entry for entry in audio_files if entry.name.lower().endswith(('.wma', '.dss'))]
                 if not selected_files:
                     print_warning("No WMA or DSS files found to convert.")
                     return []
@@ -207,24 +201,17 @@ def get_user_selection(audio_files, max_selections=3):
     
     return selected_files
 
-def show_conversion_progress(filename, current, total):
-    """Show a fun progress indicator"""
-    progress = (current / total) * 100
-    bar_length = 30
-    filled_length = int(bar_length * current // total)
-    bar = '█' * filled_length + '░' * (bar_length - filled_length)
-    
-    print(f"\rConverting: {filename} [{bar}] {progress:.1f}% ({current}/{total})", end="", flush=True)
+def get_mp3_path(input_file):
+    """Return the path of the MP3 a WMA or DSS file is converted to (same name, .mp3 extension)"""
+    return os.path.splitext(input_file)[0] + '.mp3'
 
-def convert_audio_to_mp3(input_file, bitrate="192k", current=1, total=1):
+def convert_audio_to_mp3(input_file, bitrate="192k"):
     """
     Convert a WMA or DSS file to MP3 format and save it in the same directory
     
     Args:
         input_file (str): Path to the input audio file
         bitrate (str): Bitrate for the output MP3 (default: "192k")
-        current (int): Current file number for progress display
-        total (int): Total number of files for progress display
     
     Returns:
         str: Path to the converted MP3 file, or None if conversion failed
@@ -242,7 +229,7 @@ def convert_audio_to_mp3(input_file, bitrate="192k", current=1, total=1):
             return None
         
         # Create output filename (same name but with .mp3 extension)
-        output_file = os.path.splitext(input_file)[0] + '.mp3'
+        output_file = get_mp3_path(input_file)
         
         # Check if output file already exists
         if os.path.exists(output_file):
@@ -250,26 +237,37 @@ def convert_audio_to_mp3(input_file, bitrate="192k", current=1, total=1):
             return output_file
         
         filename = os.path.basename(input_file)
-        print(f"\nConverting: {filename}")
         
-        # Show progress animation
-        for i in range(3):
-            show_conversion_progress(filename, current, total)
-            time.sleep(0.3)
+        # Let ffmpeg stream the decode and encode itself, rather than loading the whole
+        # recording into memory as PCM first
+        cmd = [
+            'ffmpeg',
+            '-hide_banner',
+            '-loglevel', 'error',
+            '-i', input_file,
+            '-vn',  # Audio only
+            '-c:a', 'libmp3lame',
+            '-b:a', bitrate,
+            '-y',
+            output_file
+        ]
         
-        # Load the audio file
-        print_progress("Loading audio file...")
-        audio = AudioSegment.from_file(input_file)
+        result = subprocess.run(cmd, capture_output=True, text=True)
         
-        # Export as MP3
-        print_progress("Converting to MP3...")
-        audio.export(output_file, format="mp3", bitrate=bitrate)
+        if result.returncode != 0:
+            # Don't leave a partial MP3 behind; the next run would skip it as already converted
+            if os.path.exists(output_file):
+                os.remove(output_file)
+            print_error(f"Error converting {filename}: {result.stderr.strip()}")
+            return None
         
-        print(f"\nSuccessfully converted: {os.path.basename(output_file)}")
         return output_file
         
+    except FileNotFoundError:
+        print_error("FFmpeg not found. Please install FFmpeg to convert audio files.")
+        return None
     except Exception as e:
-        print(f"\nError converting {os.path.basename(input_file)}: {str(e)}")
+        print_error(f"Error converting {os.path.basename(input_file)}: {str(e)}")
         return None
 
 def main():
@@ -292,14 +290,21 @@ def main():
             return
         
         # Get user selection
-        selected_files = get_user_selection(audio_files, max_selections=3)
+        selected_files = [entry.path for entry in get_user_selection(audio_files, max_selections=3)]
         
         if not selected_files:
             print_info("No files selected for conversion.")
             return
         
-        # Filter to only WMA and DSS files
-        convertible_files = [f for f in selected_files if f.lower().endswith(('.wma', '.dss'))]
+        # Filter to only WMA and DSS files, one per output MP3: "a.wma" and "a.dss" both become "a.mp3",
+        # and two conversions writing it at once would race. Compared case-insensitively, as on macOS.
+        files_by_output = {}
+        for f in selected_files:
+            if f.lower().endswith(('.wma', '.dss')):
+                kept = files_by_output.setdefault(get_mp3_path(f).casefold(), f)
+                if kept != f:
+                    print_warning(f"Skipping {os.path.basename(f)}: it would overwrite the MP3 of {os.path.basename(kept)}.")
+        convertible_files = list(files_by_output.values())
         
         if not convertible_files:
             print_warning("No WMA or DSS files selected for conversion.")
@@ -309,12 +314,26 @@ def main():
         print(f"Starting conversion of {len(convertible_files)} file(s)...")
         print_separator()
         
-        # Convert selected files
+        # Convert selected files in parallel. The work happens in ffmpeg subprocesses,
+        # so a thread per file is enough to keep the cores busy. Progress is reported here,
+        # one whole line per finished file, so output from the workers can't interleave.
         converted_files = []
         failed_files = []
+        total = len(convertible_files)
+        
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(os.cpu_count() or 1, total)) as executor:
+            futures = {
+                executor.submit(convert_audio_to_mp3, audio_file): audio_file
+                for audio_file in convertible_files
+            }
+            results = {}
+            for finished, future in enumerate(concurrent.futures.as_completed(futures), 1):
+                results[futures[future]] = future.result()
+                print_progress(f"Finished {finished} of {total}: {os.path.basename(futures[future])}")
         
-        for i, audio_file in enumerate(convertible_files, 1):
-            result = convert_audio_to_mp3(audio_file, current=i, total=len(convertible_files))
+        # Report in the order the files were selected
+        for audio_file in convertible_files:
+            result = results[audio_file]
             if result:
                 converted_files.append(result)
             else: